@@ -7,9 +7,22 @@ const App = () => {
   const canvasRef = useRef(null);
   const [detections, setDetections] = useState([]);
   const [isDetecting, setIsDetecting] = useState(false);
+  // Identifies this camera stream to the server (frame gating and tracking are per stream)
+  const streamId = useRef(Math.random().toString(36).slice(2));
+  // Latest GPS fix, sent with every frame so detections can be placed on the map
+  const position = useRef(null);
+  // Upload size, JPEG quality and pacing chosen by the server from its load (see UploadHints)
+  const hints = useRef({ max_dimension: 640, jpeg_quality: 0.8, interval_ms: 500 });
 
   useEffect(() => {
     startCamera();
+    if (!navigator.geolocation) return;
+    const watchId = navigator.geolocation.watchPosition(
+      pos => { position.current = { lat: pos.coords.latitude, lon: pos.coords.longitude }; },
+      err => console.warn('Location unavailable:', err.message),
+      { enableHighAccuracy: true }
+    );
+    return () => navigator.geolocation.clearWatch(watchId);
   }, []);
 
   const startCamera = async () => {
@@ -28,29 +41,40 @@ const App = () => {
     const canvas = canvasRef.current;
     const ctx = canvas.getContext('2d');
     
-    canvas.width = video.videoWidth;
-    canvas.height = video.videoHeight;
-    ctx.drawImage(video, 0, 0);
+    // Never upload more pixels than the model uses; boxes come back in these (scaled) coordinates
+    const { max_dimension: maxDimension, jpeg_quality: quality } = hints.current;
+    const scale = maxDimension ? Math.min(1, maxDimension / Math.max(video.videoWidth, video.videoHeight)) : 1;
+    canvas.width = Math.round(video.videoWidth * scale);
+    canvas.height = Math.round(video.videoHeight * scale);
+    ctx.drawImage(video, 0, 0, canvas.width, canvas.height);
     
-    return canvas.toDataURL('image/jpeg', 0.8);
+    // Binary JPEG upload avoids the base64 data-URL overhead on the wire
+    return new Promise(resolve => canvas.toBlob(resolve, 'image/jpeg', quality));
   };
 
   const detectPotholes = async () => {
     if (!isDetecting) return;
     
-    const frameData = captureFrame();
+    const frameData = await captureFrame();
     
     try {
-      const response = await axios.post('http://localhost:5000/detect', {
-        image: frameData
+      const response = await axios.post('http://localhost:5000/detect', frameData, {
+        params: { source: streamId.current, ...(position.current || {}) },
+        headers: { 'Content-Type': 'image/jpeg' }
       });
       
       setDetections(response.data.detections || []);
+      hints.current = { ...hints.current, ...response.data.hints };
     } catch (err) {
       console.error('Detection failed:', err);
+      // Follow the server's hint (e.g. while the model loads), otherwise back off before retrying
+      const serverHints = err.response && err.response.data && err.response.data.hints;
+      hints.current = serverHints
+        ? { ...hints.current, ...serverHints }
+        : { ...hints.current, interval_ms: Math.min(hints.current.interval_ms * 2, 5000) };
     }
     
-    setTimeout(detectPotholes, 500); // Detect every 500ms
+    setTimeout(detectPotholes, hints.current.interval_ms); // Server-paced, 500ms when idle
   };
 
   const toggleDetection = () => {
@@ -1,42 +1,56 @@
 import cv2
 import numpy as np
 from ultralytics import YOLO
+import os
+import threading
 import time
 from collections import defaultdict
 import json
+from postprocess import boxes_to_arrays
+from stream_pipeline import StreamPipeline
+from streaming_stats import Histogram, JsonlSpill, RunningStats, WindowedRate
 
 class AccuracyTracker:
-    def __init__(self):
+    def __init__(self, spill_path=None, fps_window=10):
         self.model = YOLO('yolov8n.pt')
-        self.detections = []
+        # Streaming statistics: memory stays constant however long the soak test runs
+        self.confidence = RunningStats()
+        self.confidence_hist = Histogram(0.0, 1.0, bins=100)
+        self.detect_time_hist = Histogram(0.1, 10000, bins=200, log=True)  # ms
+        self.detect_time = RunningStats()
+        self.recent_fps = WindowedRate(fps_window)
+        self.high_confidence = 0
+        self.spill = JsonlSpill(spill_path) if spill_path else None  # Optional raw detection log
+        self.lock = threading.Lock()
         self.frame_count = 0
         self.start_time = time.time()
         
     def calculate_metrics(self):
         """Calculate detection accuracy metrics"""
-        if not self.detections:
-            return {"accuracy": 0, "fps": 0, "confidence_avg": 0}
+        with self.lock:
+            total = self.confidence.count
+            if not total:
+                return {"accuracy": 0, "fps": 0, "confidence_avg": 0}
             
-        # Calculate average confidence
-        confidences = [d['confidence'] for d in self.detections]
-        avg_confidence = sum(confidences) / len(confidences)
-        
-        # Calculate FPS
-        elapsed_time = time.time() - self.start_time
-        fps = self.frame_count / elapsed_time if elapsed_time > 0 else 0
-        
-        # Accuracy based on confidence threshold
-        high_conf_detections = len([d for d in confidences if d > 0.7])
-        accuracy = (high_conf_detections / len(confidences)) * 100 if confidences else 0
-        
-        return {
-            "total_detections": len(self.detections),
-            "accuracy": round(accuracy, 2),
-            "avg_confidence": round(avg_confidence * 100, 2),
-            "fps": round(fps, 2),
-            "high_confidence": high_conf_detections,
-            "processing_time": round(elapsed_time, 2)
-        }
+            # Calculate FPS
+            elapsed_time = time.time() - self.start_time
+            fps = self.frame_count / elapsed_time if elapsed_time > 0 else 0
+            
+            # Accuracy based on confidence threshold
+            accuracy = (self.high_confidence / total) * 100
+            
+            return {
+                "total_detections": total,
+                "accuracy": round(accuracy, 2),
+                "avg_confidence": round(self.confidence.mean * 100, 2),
+                "p50_confidence": round(self.confidence_hist.quantile(0.5) * 100, 2),
+                "fps": round(fps, 2),
+                "recent_fps": round(self.recent_fps.rate(), 2),
+                "high_confidence": self.high_confidence,
+                "avg_detect_ms": round(self.detect_time.mean, 2),
+                "p95_detect_ms": round(self.detect_time_hist.quantile(0.95), 2),
+                "processing_time": round(elapsed_time, 2)
+            }
     
     def detect_and_measure(self, frame):
         """Run detection and measure performance"""
@@ -44,40 +58,43 @@ class AccuracyTracker:
         results = self.model(frame)
         detect_time = time.time() - start_detect
         
-        frame_detections = []
-        for r in results:
-            boxes = r.boxes
-            if boxes is not None:
-                for box in boxes:
-                    x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
-                    conf = box.conf[0].cpu().numpy()
-                    
-                    if conf > 0.3:  # Detection threshold
-                        detection = {
-                            'confidence': float(conf),
-                            'bbox': [int(x1), int(y1), int(x2), int(y2)],
-                            'detection_time': detect_time,
-                            'frame_id': self.frame_count
-                        }
-                        frame_detections.append(detection)
-                        self.detections.append(detection)
+        xyxy, conf = boxes_to_arrays(results[0])
+        keep = conf > 0.3  # Detection threshold
+        conf = conf[keep]
+        
+        frame_detections = [
+            {
+                'confidence': c,
+                'bbox': bbox,
+                'detection_time': detect_time,
+                'frame_id': self.frame_count
+            }
+            for bbox, c in zip(xyxy[keep].astype(int).tolist(), conf.astype(float).tolist())
+        ]
         
-        self.frame_count += 1
+        with self.lock:
+            self.confidence.add_many(conf)
+            self.confidence_hist.add_many(conf)
+            self.high_confidence += int((conf > 0.7).sum())
+            self.detect_time.add(detect_time * 1000)
+            self.detect_time_hist.add(detect_time * 1000)
+            self.recent_fps.add()
+            if self.spill:
+                self.spill.write(frame_detections)
+            self.frame_count += 1
         return frame_detections, results
     
-    def run_accuracy_test(self, duration=30):
+    def run_accuracy_test(self, duration=30, video_source=0):
         """Run accuracy test for specified duration"""
         print(f"🎯 Starting {duration}s accuracy test...")
         
-        cap = cv2.VideoCapture(0)
+        # Capture and inference overlap on separate threads
+        pipeline = StreamPipeline(video_source, self.detect_and_measure)
         end_time = time.time() + duration
         
-        while time.time() < end_time:
-            ret, frame = cap.read()
-            if not ret:
+        for frame, (detections, results) in pipeline.frames():
+            if time.time() >= end_time:
                 break
-                
-            detections, results = self.detect_and_measure(frame)
             
             # Draw results
             annotated_frame = results[0].plot()
@@ -96,11 +113,13 @@ class AccuracyTracker:
             if cv2.waitKey(1) & 0xFF == ord('q'):
                 break
         
-        cap.release()
         cv2.destroyAllWindows()
+        if self.spill:
+            self.spill.flush()
         
         # Final results
         final_metrics = self.calculate_metrics()
+        final_metrics['dropped_frames'] = pipeline.stats()['dropped_frames']
         print("\n📊 ACCURACY RESULTS:")
         print("=" * 40)
         for key, value in final_metrics.items():
@@ -110,7 +129,8 @@ class AccuracyTracker:
 
 def benchmark_model():
     """Benchmark model performance"""
-    tracker = AccuracyTracker()
+    # Set STREETSCAN_DETECTION_LOG to keep every raw detection on disk (JSON lines) during soak tests
+    tracker = AccuracyTracker(spill_path=os.environ.get('STREETSCAN_DETECTION_LOG'))
     
     # Test different scenarios
     scenarios = {
@@ -0,0 +1,246 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+import cv2
+import numpy as np
+from postprocess import boxes_to_arrays, severity_index
+
+VIDEO_SUFFIXES = {'.mp4', '.avi', '.mov', '.mkv', '.m4v', '.ts'}
+
+def find_videos(inputs):
+    """Video files from a mix of file and directory arguments (directories are searched recursively)"""
+    videos = []
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            videos.extend(p for p in path.rglob('*') if p.suffix.lower() in VIDEO_SUFFIXES)
+        elif path.is_file():
+            videos.append(path)
+    return sorted(set(str(v) for v in videos))
+
+def plan_jobs(videos, chunk_frames=9000):
+    """Split every video into frame ranges so one long drive is spread over several processes"""
+    jobs = []
+    for video in videos:
+        cap = cv2.VideoCapture(video)
+        total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        cap.release()
+        if total <= 0:
+            print(f"⚠️ Skipping {video}: unknown frame count")
+            continue
+        for start in range(0, total, chunk_frames):
+            jobs.append((video, start, min(start + chunk_frames, total)))
+    return jobs
+
+def run_version(model_path, runtime, imgsz, conf_threshold, stride, severity_thresholds):
+    """Short id of the weights and every setting that changes a chunk's results"""
+    from detection_engine import DetectionConfig, model_version
+    config = DetectionConfig(model_path=model_path, runtime=runtime, conf_threshold=conf_threshold, imgsz=imgsz)
+    return f"{model_version(config)}:{stride}:{tuple(severity_thresholds)}"
+
+def job_output(output_dir, video, start, end, fmt, version=''):
+    """Deterministic output name per (video, frame range, run version) so finished jobs can be skipped on resume
+
+    Changing the model or a result-affecting setting changes the name, so those chunks are redone
+    instead of silently reusing results computed with other settings.
+    """
+    stat = os.stat(video)
+    identity = f"{os.path.abspath(video)}:{stat.st_size}:{int(stat.st_mtime)}:{version}"
+    key = hashlib.sha1(identity.encode()).hexdigest()[:10]
+    return os.path.join(output_dir, f"{Path(video).stem}_{key}_{start:08d}-{end:08d}.{fmt}")
+
+def _init_worker(model_path, settings):
+    """Load one model per process with an even share of the cores"""
+    global _model, _settings
+    from detection_engine import DetectionConfig, load_model
+    from serve import configure_torch_threads
+    configure_torch_threads(settings['torch_threads'])
+    _model = load_model(DetectionConfig(model_path=model_path, runtime=settings['runtime']))
+    _settings = settings
+
+def seek(cap, start):
+    """Position cap exactly at frame start; False if the video ends before it
+
+    Some backends seek inter-coded streams only to a nearby keyframe, so the position is read
+    back and the remaining frames are grabbed forward (from the beginning after an overshoot).
+    """
+    position = 0
+    if start:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+        position = int(cap.get(cv2.CAP_PROP_POS_FRAMES))
+        if position > start:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            position = int(cap.get(cv2.CAP_PROP_POS_FRAMES))
+    for _ in range(position, start):
+        if not cap.grab():
+            return False
+    return True
+
+def read_frames(video, start, end, stride):
+    """Yield (frame_index, frame) for frames in [start, end) whose index is a multiple of stride
+
+    The stride is aligned to the whole video so results don't depend on how it was chunked.
+    Skipped frames are only grabbed, not retrieved, so they are never converted to BGR.
+    """
+    cap = cv2.VideoCapture(video)
+    try:
+        if not seek(cap, start):
+            return
+        for index in range(start, end):
+            if not cap.grab():
+                break
+            if index % stride:
+                continue
+            ok, frame = cap.retrieve()
+            if ok:
+                yield index, frame
+    finally:
+        cap.release()
+
+def _process_job(job):
+    """Detect potholes in one frame range and write the columns to output atomically"""
+    video, start, end, output = job
+    stride, batch_size = _settings['stride'], _settings['batch_size']
+    conf_threshold, severity_thresholds = _settings['conf_threshold'], _settings['severity_thresholds']
+
+    cap = cv2.VideoCapture(video)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+    cap.release()
+
+    columns = {'frame': [], 'xyxy': [], 'confidence': [], 'severity': []}
+    frames_done, inference_time = 0, 0.0
+    batch, indices = [], []
+
+    def flush():
+        nonlocal inference_time
+        started = time.perf_counter()
+        results = _model(batch, imgsz=_settings['imgsz'], verbose=False)
+        inference_time += time.perf_counter() - started
+        for index, frame, result in zip(indices, batch, results):
+            xyxy, conf = boxes_to_arrays(result)
+            keep = conf > conf_threshold
+            xyxy, conf = xyxy[keep], conf[keep]
+            columns['frame'].append(np.full(len(conf), index, dtype=np.int32))
+            columns['xyxy'].append(xyxy.astype(np.float32))
+            columns['confidence'].append(conf.astype(np.float32))
+            columns['severity'].append(severity_index(xyxy, frame.shape, severity_thresholds).astype(np.int8))
+
+    for index, frame in read_frames(video, start, end, stride):
+        batch.append(frame)
+        indices.append(index)
+        if len(batch) == batch_size:
+            flush()
+            frames_done += len(batch)
+            batch, indices = [], []
+    if batch:
+        flush()
+        frames_done += len(batch)
+
+    data = {
+        'frame': np.concatenate(columns['frame']) if columns['frame'] else np.zeros(0, np.int32),
+        'xyxy': np.concatenate(columns['xyxy']) if columns['xyxy'] else np.zeros((0, 4), np.float32),
+        'confidence': np.concatenate(columns['confidence']) if columns['confidence'] else np.zeros(0, np.float32),
+        'severity': np.concatenate(columns['severity']) if columns['severity'] else np.zeros(0, np.int8)
+    }
+    write_columns(output, data, video, fps)
+    return {'video': video, 'start': start, 'end': end, 'frames': frames_done,
+            'detections': len(data['confidence']), 'inference_time': inference_time}
+
+def write_columns(output, data, video, fps):
+    """NPZ or Parquet; written to a temporary file first so a crash never leaves a half file behind"""
+    tmp = output + '.tmp'
+    if output.endswith('.parquet'):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        table = pa.table({
+            'frame': data['frame'],
+            'time_s': (data['frame'] / fps).astype(np.float32) if fps else np.zeros(len(data['frame']), np.float32),
+            'x1': data['xyxy'][:, 0], 'y1': data['xyxy'][:, 1],
+            'x2': data['xyxy'][:, 2], 'y2': data['xyxy'][:, 3],
+            'confidence': data['confidence'],
+            'severity': data['severity']
+        }).replace_schema_metadata({'video': video, 'fps': str(fps), 'severity_levels': 'Low,Medium,High'})
+        pq.write_table(table, tmp, compression='zstd')
+    else:
+        with open(tmp, 'wb') as f:
+            np.savez_compressed(f, video=video, fps=fps, severity_levels=np.array(['Low', 'Medium', 'High']), **data)
+    os.replace(tmp, output)
+
+def process(inputs, output_dir='batch_output', model_path='pothole_detector.pt', runtime='pytorch',
+            workers=None, stride=5, batch_size=16, imgsz=640, conf_threshold=0.3,
+            severity_thresholds=(0.01, 0.05), chunk_frames=9000, fmt='npz'):
+    """Run detection over recorded videos across a process pool, resuming past finished chunks"""
+    from serve import torch_threads_per_worker
+    videos = find_videos(inputs)
+    if not videos:
+        raise FileNotFoundError(f"No videos found in {inputs}")
+
+    os.makedirs(output_dir, exist_ok=True)
+    version = run_version(model_path, runtime, imgsz, conf_threshold, stride, severity_thresholds)
+    jobs = [(video, start, end, job_output(output_dir, video, start, end, fmt, version))
+            for video, start, end in plan_jobs(videos, chunk_frames)]
+    pending = [job for job in jobs if not os.path.exists(job[3])]
+    print(f"🎬 {len(videos)} videos, {len(jobs)} chunks ({len(jobs) - len(pending)} already done)")
+    if not pending:
+        return {'videos': len(videos), 'chunks': len(jobs), 'frames': 0}
+
+    cores = os.cpu_count() or 1
+    workers = min(workers or cores, len(pending))
+    settings = {'stride': stride, 'batch_size': batch_size, 'imgsz': imgsz, 'runtime': runtime,
+                'conf_threshold': conf_threshold, 'severity_thresholds': tuple(severity_thresholds),
+                'torch_threads': torch_threads_per_worker(workers, cores)}
+
+    frames = detections = 0
+    started = time.perf_counter()
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(model_path, settings)) as pool:
+        futures = [pool.submit(_process_job, job) for job in pending]
+        for done, future in enumerate(as_completed(futures), 1):
+            part = future.result()
+            frames += part['frames']
+            detections += part['detections']
+            print(f"✅ [{done}/{len(pending)}] {Path(part['video']).name} "
+                  f"{part['start']}-{part['end']}: {part['frames']} frames, {part['detections']} detections")
+    elapsed = time.perf_counter() - started
+
+    report = {
+        'videos': len(videos),
+        'chunks': len(jobs),
+        'processed_chunks': len(pending),
+        'frames': frames,
+        'detections': detections,
+        'elapsed_s': round(elapsed, 1),
+        'fps': round(frames / elapsed, 2),
+        'fps_per_core': round(frames / elapsed / min(workers * settings['torch_threads'], cores), 2),
+        'workers': workers,
+        'torch_threads_per_worker': settings['torch_threads'],
+        'stride': stride
+    }
+    with open(os.path.join(output_dir, 'run_summary.json'), 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"📊 {frames} frames in {elapsed:.1f}s: {report['fps']} FPS total, {report['fps_per_core']} FPS per core")
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless pothole detection over recorded dashcam footage")
+    parser.add_argument('inputs', nargs='+', help="video files and/or directories")
+    parser.add_argument('--output', default='batch_output', help="directory for per-chunk results")
+    parser.add_argument('--model', default='pothole_detector.pt')
+    parser.add_argument('--runtime', default='pytorch', help="pytorch, onnx, onnx-int8, openvino, openvino-int8")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--stride', type=int, default=5, help="process every n-th frame (like vid_stride)")
+    parser.add_argument('--batch', type=int, default=16)
+    parser.add_argument('--imgsz', type=int, default=640)
+    parser.add_argument('--conf', type=float, default=0.3)
+    parser.add_argument('--chunk-frames', type=int, default=9000, help="frames per job when splitting long videos")
+    parser.add_argument('--format', choices=['npz', 'parquet'], default='npz')
+    args = parser.parse_args()
+
+    process(args.inputs, args.output, args.model, args.runtime, args.workers, args.stride, args.batch,
+            args.imgsz, args.conf, chunk_frames=args.chunk_frames, fmt=args.format)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+import os
+import queue
+import threading
+import time
+from collections import Counter, deque
+from metrics import metrics
+
+
+class _PendingFrame:
+    """One frame waiting for a batched forward pass"""
+
+    __slots__ = ('frame', 'enqueued_at', 'done', 'result', 'error')
+
+    def __init__(self, frame):
+        self.frame = frame
+        self.enqueued_at = time.perf_counter()
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class BatchScheduler:
+    """Collect frames from concurrent requests and run them through one batched model call"""
+
+    def __init__(self, model, max_batch_size=8, max_wait_ms=5, **predict_kwargs):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.predict_kwargs = predict_kwargs
+        self.predict_kwargs.setdefault('verbose', False)
+
+        self._start_lock = threading.Lock()
+        self._pid = None
+        self._start_worker()
+
+    def _start_worker(self):
+        """(Re)create the queue and worker thread; threads don't survive fork, so workers start their own"""
+        self._queue = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self._batch_sizes = Counter()
+        self._queue_latencies = deque(maxlen=1000)
+        self._frames_processed = 0
+
+        self._worker = threading.Thread(target=self._run, name='batch-scheduler', daemon=True)
+        self._worker.start()
+        self._pid = os.getpid()
+
+    def _ensure_worker(self):
+        if self._pid != os.getpid():
+            with self._start_lock:
+                if self._pid != os.getpid():
+                    self._start_worker()
+
+    def predict(self, frame, timeout=None):
+        """Queue a frame and block until its result is ready"""
+        return self.predict_many([frame], timeout)[0]
+
+    def predict_many(self, frames, timeout=None):
+        """Queue several frames at once and block until all their results are ready"""
+        self._ensure_worker()
+        pending = [_PendingFrame(frame) for frame in frames]
+        for item in pending:
+            self._queue.put(item)
+
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        for item in pending:
+            remaining = None if deadline is None else max(0.0, deadline - time.perf_counter())
+            if not item.done.wait(remaining):
+                raise TimeoutError("Timed out waiting for batched inference")
+            if item.error is not None:
+                raise item.error
+        return [item.result for item in pending]
+
+    def _collect_batch(self):
+        """Block for the first frame, then gather more until the batch is full or the wait expires"""
+        batch = [self._queue.get()]
+        deadline = batch[0].enqueued_at + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            started = time.perf_counter()
+
+            try:
+                results = self.model([p.frame for p in batch], **self.predict_kwargs)
+                for pending, result in zip(batch, results):
+                    pending.result = result
+            except Exception as e:
+                for pending in batch:
+                    pending.error = e
+
+            with self._stats_lock:
+                self._batch_sizes[len(batch)] += 1
+                self._frames_processed += len(batch)
+                self._queue_latencies.extend(started - p.enqueued_at for p in batch)
+            for pending in batch:
+                metrics.observe('queue', started - pending.enqueued_at)
+
+            for pending in batch:
+                pending.done.set()
+
+    def queue_depth(self):
+        """Frames waiting for a batch, cheap enough to check on every request"""
+        return self._queue.qsize()
+
+    def stats(self):
+        """Queue depth, batch-size histogram and queue latency percentiles (ms)"""
+        with self._stats_lock:
+            latencies = sorted(self._queue_latencies)
+            histogram = dict(sorted(self._batch_sizes.items()))
+            frames = self._frames_processed
+
+        def percentile(p):
+            if not latencies:
+                return 0.0
+            index = min(len(latencies) - 1, int(round(p / 100 * (len(latencies) - 1))))
+            return round(latencies[index] * 1000, 3)
+
+        batches = sum(histogram.values())
+        return {
+            'queue_depth': self.queue_depth(),
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait * 1000,
+            'batches': batches,
+            'frames': frames,
+            'avg_batch_size': round(frames / batches, 2) if batches else 0,
+            'batch_size_histogram': histogram,
+            'queue_latency_ms': {
+                'p50': percentile(50),
+                'p95': percentile(95),
+                'p99': percentile(99),
+                'max': round(latencies[-1] * 1000, 3) if latencies else 0.0
+            }
+        }
@@ -0,0 +1,276 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+import cv2
+import numpy as np
+from postprocess import boxes_to_arrays, classify_severity, to_records
+
+IMAGE_SUFFIXES = {'.jpg', '.jpeg', '.png', '.bmp'}
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB (None where unavailable)"""
+    try:
+        import resource
+    except ImportError:
+        try:
+            import psutil
+            return round(psutil.Process().memory_info().peak_wset / 2**20, 1)
+        except (ImportError, AttributeError):
+            return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / 2**20 if sys.platform == 'darwin' else peak / 2**10, 1)
+
+def load_frames(frames_dir=None, video=None, count=64, width=1280, height=720, seed=0):
+    """Fixed replay set as encoded JPEG bytes: a folder of images, a video file or seeded synthetic frames"""
+    if frames_dir:
+        paths = sorted(p for p in Path(frames_dir).glob('*') if p.suffix.lower() in IMAGE_SUFFIXES)[:count]
+        return [p.read_bytes() for p in paths]
+
+    if video:
+        cap = cv2.VideoCapture(video)
+        encoded = []
+        while len(encoded) < count:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            encoded.append(cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 80])[1].tobytes())
+        cap.release()
+        return encoded
+
+    rng = np.random.default_rng(seed)
+    frames = []
+    for _ in range(count):
+        frame = rng.integers(60, 120, (height, width, 3), dtype=np.uint8)
+        frames.append(cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 80])[1].tobytes())
+    return frames
+
+def summarize(samples_ms):
+    values = np.asarray(samples_ms, dtype=np.float64)
+    if not len(values):
+        return {'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'mean': 0.0}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {'p50': round(p50, 3), 'p95': round(p95, 3), 'p99': round(p99, 3), 'mean': round(values.mean(), 3)}
+
+def run_config(model, encoded, batch_size, imgsz, conf_threshold, repeats, warmup=2):
+    """Replay the frames in batches and time every stage (per-frame ms except inference, which is per batch)"""
+    stages = {name: [] for name in ('decode', 'preprocess', 'inference', 'nms', 'postprocess', 'severity', 'serialize')}
+    batches = [encoded[i:i + batch_size] for i in range(0, len(encoded), batch_size)]
+
+    for _ in range(warmup):
+        model([cv2.imdecode(np.frombuffer(b, np.uint8), cv2.IMREAD_COLOR) for b in batches[0]],
+              imgsz=imgsz, verbose=False)
+
+    frames_done = 0
+    started = time.perf_counter()
+    for _ in range(repeats):
+        for batch in batches:
+            frames = []
+            for data in batch:
+                t = time.perf_counter()
+                frames.append(cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR))
+                stages['decode'].append((time.perf_counter() - t) * 1000)
+
+            t = time.perf_counter()
+            results = model(frames, imgsz=imgsz, verbose=False)
+            stages['inference'].append((time.perf_counter() - t) * 1000)
+
+            for frame, result in zip(frames, results):
+                # Ultralytics' own per-image split of the model call
+                stages['preprocess'].append(result.speed['preprocess'])
+                stages['nms'].append(result.speed['postprocess'])
+
+                t = time.perf_counter()
+                xyxy, conf = boxes_to_arrays(result)
+                keep = conf > conf_threshold
+                xyxy, conf = xyxy[keep], conf[keep]
+                stages['postprocess'].append((time.perf_counter() - t) * 1000)
+
+                t = time.perf_counter()
+                severity = classify_severity(xyxy, frame.shape)
+                stages['severity'].append((time.perf_counter() - t) * 1000)
+
+                t = time.perf_counter()
+                json.dumps({'detections': to_records(xyxy, conf, severity)})
+                stages['serialize'].append((time.perf_counter() - t) * 1000)
+
+            frames_done += len(frames)
+    elapsed = time.perf_counter() - started
+
+    return {
+        'batch_size': batch_size,
+        'imgsz': imgsz,
+        'frames': frames_done,
+        'throughput_fps': round(frames_done / elapsed, 2),
+        'stages_ms': {name: summarize(samples) for name, samples in stages.items()}
+    }
+
+def run_http(encoded, repeats, url=None, model_path=None, imgsz=640):
+    """Round-trip latency of /detect: a running server if url is given, otherwise the Flask app in-process"""
+    samples = []
+    if url:
+        import urllib.request
+        for n in range(repeats):
+            for i, data in enumerate(encoded):
+                # Unique trailer after the JPEG end marker (decoders ignore it) so the server's result
+                # cache can't answer replayed frames
+                data = data + (n * len(encoded) + i).to_bytes(8, 'little')
+                request = urllib.request.Request(url, data=data, headers={'Content-Type': 'image/jpeg'})
+                t = time.perf_counter()
+                with urllib.request.urlopen(request, timeout=60) as response:
+                    response.read()
+                samples.append((time.perf_counter() - t) * 1000)
+        return {'target': url, 'round_trip_ms': summarize(samples)}
+
+    from detection_engine import DetectionConfig, get_engine
+    get_engine(DetectionConfig(model_path=model_path, imgsz=imgsz))  # backend_api reuses this engine
+    import backend_api
+    import detection_api
+    detection_api.results = None  # Repeats replay the same bytes; measure inference, not result cache hits
+    client = backend_api.app.test_client()
+    client.post('/detect', data=encoded[0], content_type='image/jpeg')  # Warm up
+    for _ in range(repeats):
+        for data in encoded:
+            t = time.perf_counter()
+            client.post('/detect', data=data, content_type='image/jpeg')
+            samples.append((time.perf_counter() - t) * 1000)
+    return {'target': 'in-process backend_api', 'round_trip_ms': summarize(samples)}
+
+COLD_START_SCRIPT = '''
+import importlib, json, sys, time
+started = time.perf_counter()
+module = importlib.import_module(sys.argv[1])
+imported = time.perf_counter()
+client = module.app.test_client()
+while client.get('/ready').status_code != 200:
+    time.sleep(0.02)
+ready = time.perf_counter()
+response = client.post('/detect', data=sys.stdin.buffer.read(), content_type='image/jpeg')
+first = time.perf_counter()
+print(json.dumps({'status': response.status_code, 'import_s': imported - started, 'ready_s': ready - started,
+                  'first_detection_s': first - started, 'engine': client.get('/ready').get_json()}))
+'''
+
+def measure_cold_start(frame, app_module='backend_api', model_path=None, imgsz=640):
+    """Start a fresh interpreter and time app import, readiness and the first detection"""
+    env = dict(os.environ, STREETSCAN_IMGSZ=str(imgsz))
+    if model_path:
+        env['STREETSCAN_MODEL'] = model_path
+    started = time.perf_counter()
+    output = subprocess.run([sys.executable, '-c', COLD_START_SCRIPT, app_module], input=frame, env=env,
+                            capture_output=True, cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout
+    total = time.perf_counter() - started
+    timings = json.loads(output.decode().strip().splitlines()[-1])
+    return {
+        'app': app_module,
+        'app_import_s': round(timings['import_s'], 3),
+        'ready_s': round(timings['ready_s'], 3),
+        'first_detection_s': round(timings['first_detection_s'], 3),
+        'process_to_first_detection_s': round(total, 3),  # Includes interpreter start-up
+        'engine': timings['engine']
+    }
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        commit = None
+
+    import torch
+    return {
+        'commit': commit or None,
+        'python': platform.python_version(),
+        'torch': torch.__version__,
+        'torch_threads': torch.get_num_threads(),
+        'opencv': cv2.__version__,
+        'cpu_count': os.cpu_count(),
+        'platform': platform.platform()
+    }
+
+def compare(baseline_path, current, tolerance=0.10, min_delta_ms=0.5):
+    """Print p50 changes per stage against a previous run; returns the list of regressions
+
+    A stage only counts as regressed if it got both relatively and absolutely slower, so
+    jitter on sub-millisecond stages doesn't fail the comparison.
+    """
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+
+    old_runs = {(r['batch_size'], r['imgsz']): r for r in baseline['runs']}
+    regressions = []
+    for run in current['runs']:
+        old = old_runs.get((run['batch_size'], run['imgsz']))
+        if old is None:
+            continue
+        for stage, stats in run['stages_ms'].items():
+            before = old['stages_ms'].get(stage, {}).get('p50')
+            if not before:
+                continue
+            change = (stats['p50'] - before) / before
+            regressed = change > tolerance and stats['p50'] - before > min_delta_ms
+            marker = '🔺' if regressed else '  '
+            print(f"{marker} batch={run['batch_size']} imgsz={run['imgsz']} {stage}: "
+                  f"{before:.2f} -> {stats['p50']:.2f} ms ({change:+.0%})")
+            if regressed:
+                regressions.append((run['batch_size'], run['imgsz'], stage, change))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless, reproducible throughput/latency benchmark")
+    parser.add_argument('--model', default='pothole_detector.pt')
+    parser.add_argument('--frames', help="folder of images to replay")
+    parser.add_argument('--video', help="video file to replay")
+    parser.add_argument('--count', type=int, default=64, help="number of frames to replay")
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 4, 8])
+    parser.add_argument('--imgsz', type=int, nargs='+', default=[320, 640])
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--conf', type=float, default=0.3)
+    parser.add_argument('--url', help="also time a running server's /detect (default: in-process app)")
+    parser.add_argument('--skip-http', action='store_true')
+    parser.add_argument('--skip-cold-start', action='store_true')
+    parser.add_argument('--compare', help="previous benchmark JSON to diff against")
+    parser.add_argument('--output', default='benchmark_results.json')
+    args = parser.parse_args()
+
+    from ultralytics import YOLO
+    encoded = load_frames(args.frames, args.video, args.count)
+    if not encoded:
+        raise SystemExit("No frames to replay")
+
+    model = YOLO(args.model, task='detect')
+    report = {'environment': environment(), 'model': args.model, 'frames': len(encoded), 'runs': []}
+
+    for imgsz in args.imgsz:
+        for batch_size in args.batch_sizes:
+            run = run_config(model, encoded, batch_size, imgsz, args.conf, args.repeats)
+            report['runs'].append(run)
+            print(f"⚡ batch={batch_size} imgsz={imgsz}: {run['throughput_fps']} FPS, "
+                  f"inference p99 {run['stages_ms']['inference']['p99']} ms")
+
+    if not args.skip_http:
+        report['http'] = run_http(encoded, args.repeats, args.url, args.model, max(args.imgsz))
+        print(f"🌐 HTTP round trip p50 {report['http']['round_trip_ms']['p50']} ms")
+
+    if not args.skip_cold_start:
+        report['cold_start'] = measure_cold_start(encoded[0], model_path=args.model, imgsz=max(args.imgsz))
+        print(f"🧊 Cold start: import {report['cold_start']['app_import_s']}s, "
+              f"first detection after {report['cold_start']['process_to_first_detection_s']}s")
+
+    report['peak_rss_mb'] = peak_rss_mb()
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ Results saved to {args.output} (peak RSS {report['peak_rss_mb']} MB)")
+
+    if args.compare:
+        regressions = compare(args.compare, report)
+        if regressions:
+            raise SystemExit(f"❌ {len(regressions)} stage(s) regressed")
+
+if __name__ == "__main__":
+    main()
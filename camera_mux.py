@@ -0,0 +1,271 @@
+import argparse
+import threading
+import time
+from stream_pipeline import LatestFrameQueue, _END, is_live_source, open_capture
+from streaming_stats import WindowedRate
+
+class CameraStream:
+    """Capture thread for one source feeding a latest-frame slot
+
+    Frames are grabbed continuously so a live camera's buffer never goes stale, but only
+    decoded when the stream is due (fps_target) and its previous frame has been taken.
+    Live sources are reopened with backoff when they fail; files simply end.
+    """
+
+    def __init__(self, name, source, fps_target=None, stall_timeout=5.0, notify=None):
+        self.name = name
+        self.source = source
+        self.live = is_live_source(source)
+        self.fps_target = fps_target
+        self.stall_timeout = stall_timeout
+        self.slot = LatestFrameQueue()
+        self.notify = notify or (lambda: None)
+        self.captured = 0
+        self.inferred = 0
+        self.detections = 0
+        self.skipped = 0
+        self.reconnects = 0
+        self.last_frame_at = None
+        self.last_error = None
+        self.state = 'starting'
+        self.rate = WindowedRate(10)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._capture_loop, name=f'camera-{self.name}', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def join(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _capture_loop(self):
+        backoff = 1.0
+        interval = 1.0 / self.fps_target if self.fps_target else 0.0
+        next_due = 0.0
+        while not self._stop.is_set():
+            cap = open_capture(self.source)
+            if not cap.isOpened():
+                cap.release()
+                self.last_error = 'could not open source'
+                if not self.live:
+                    break
+                self.state = 'reconnecting'
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, 30.0)
+                self.reconnects += 1
+                continue
+
+            backoff = 1.0
+            try:
+                while not self._stop.is_set():
+                    if not self.live:
+                        # Files aren't real time: wait for the slot and the schedule instead of skipping frames
+                        while (self.slot.full() or time.perf_counter() < next_due) and not self._stop.is_set():
+                            self._stop.wait(0.005)
+                    if not cap.grab():
+                        self.last_error = 'read failed' if self.live else None
+                        break
+                    now = time.perf_counter()
+                    if now < next_due or self.slot.full():
+                        self.skipped += 1  # Not due yet or the last frame is still waiting: don't decode
+                        continue
+                    ok, frame = cap.retrieve()
+                    if not ok:
+                        continue
+                    next_due = max(next_due + interval, now) if interval else 0.0
+                    self.captured += 1
+                    self.last_frame_at = time.time()
+                    self.state = 'ok'
+                    self.slot.put(frame)
+                    self.notify()
+            finally:
+                cap.release()
+
+            if not self.live:
+                break
+            self.state = 'reconnecting'
+            self.reconnects += 1
+            self._stop.wait(backoff)
+
+        self.state = 'stopped' if self._stop.is_set() else 'ended'
+        self.slot.put(_END)
+        self.notify()
+
+    def take(self):
+        """The waiting frame, or None if there is none right now"""
+        if not self.slot.full():
+            return None
+        frame = self.slot.get(timeout=0)
+        return None if frame is _END else frame
+
+    def health(self):
+        state = self.state
+        if state == 'ok' and self.last_frame_at and time.time() - self.last_frame_at > self.stall_timeout:
+            state = 'stalled'
+        return {
+            'state': state,
+            'source': str(self.source),
+            'fps': round(self.rate.rate(), 2),
+            'fps_target': self.fps_target,
+            'captured': self.captured,
+            'inferred': self.inferred,
+            'detections': self.detections,
+            'skipped_frames': self.skipped + self.slot.dropped,
+            'reconnects': self.reconnects,
+            'last_frame_age': round(time.time() - self.last_frame_at, 2) if self.last_frame_at else None,
+            'last_error': self.last_error
+        }
+
+class CameraMultiplexer:
+    """Serve many cameras from one resident model
+
+    Each camera has its own capture thread; one inference thread takes at most one waiting
+    frame per camera, starting from a rotating offset so no camera is starved, runs them
+    as one batch and routes the results back to on_result(name, frame, detections).
+    """
+
+    def __init__(self, sources, detect_batch, on_result=None, fps_target=None, max_batch_size=16,
+                 stall_timeout=5.0):
+        if not isinstance(sources, dict):
+            sources = {f'cam{i}': source for i, source in enumerate(sources)}
+        self._ready = threading.Condition()
+        # fps_target is one rate for every camera or a {name: rate} dict
+        self.streams = [CameraStream(name, source,
+                                     fps_target.get(name) if isinstance(fps_target, dict) else fps_target,
+                                     stall_timeout, self._wake) for name, source in sources.items()]
+        self.detect_batch = detect_batch
+        self.on_result = on_result
+        self.max_batch_size = max_batch_size
+        self.latest = {}  # name -> (timestamp, detections)
+        self.batches = 0
+        self._offset = 0
+        self._pending = False
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _wake(self):
+        with self._ready:
+            self._pending = True
+            self._ready.notify()
+
+    def start(self):
+        for stream in self.streams:
+            stream.start()
+        self._thread = threading.Thread(target=self._inference_loop, name='camera-mux', daemon=True)
+        self._thread.start()
+        return self
+
+    def _collect(self):
+        """One frame from each camera that has one, in round-robin order"""
+        n = len(self.streams)
+        batch = []
+        for i in range(n):
+            stream = self.streams[(self._offset + i) % n]
+            frame = stream.take()
+            if frame is not None:
+                batch.append((stream, frame))
+                if len(batch) == self.max_batch_size:
+                    break
+        self._offset = (self._offset + 1) % n
+        return batch
+
+    def _inference_loop(self):
+        while not self._stop.is_set():
+            with self._ready:
+                self._ready.wait_for(lambda: self._pending or self._stop.is_set(), timeout=0.5)
+                self._pending = False
+            batch = self._collect()
+            if not batch:
+                if all(s.state in ('ended', 'stopped') for s in self.streams):
+                    break
+                continue
+            if len(batch) == self.max_batch_size:
+                self._wake()  # More cameras may still be waiting
+
+            results = self.detect_batch([frame for _, frame in batch])
+            self.batches += 1
+            now = time.time()
+            for (stream, frame), detections in zip(batch, results):
+                stream.inferred += 1
+                stream.detections += len(detections)
+                stream.rate.add()
+                self.latest[stream.name] = (now, detections)
+                if self.on_result is not None:
+                    self.on_result(stream.name, frame, detections)
+
+    def stop(self):
+        self._stop.set()
+        for stream in self.streams:
+            stream.stop()
+        self._wake()
+
+    def join(self, timeout=None):
+        """Wait for the inference and capture threads; timeout bounds the whole call, not each thread"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        threads = [self._thread] if self._thread is not None else []
+        threads += [stream._thread for stream in self.streams if stream._thread is not None]
+        for thread in threads:
+            thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def health(self):
+        streams = {s.name: s.health() for s in self.streams}
+        return {
+            'streams': streams,
+            'healthy': sum(h['state'] == 'ok' for h in streams.values()),
+            'batches': self.batches,
+            'avg_batch_size': round(sum(s.inferred for s in self.streams) / self.batches, 2) if self.batches else 0.0
+        }
+
+def main():
+    parser = argparse.ArgumentParser(description="Run many cameras through one resident pothole model")
+    parser.add_argument('sources', nargs='+', help="camera indexes, RTSP/HTTP URLs or files (name=source to label)")
+    parser.add_argument('--fps', type=float, default=None, help="per-camera frame rate target")
+    parser.add_argument('--max-batch', type=int, default=16)
+    parser.add_argument('--store', help="SQLite file to record detections in, tagged with the camera name")
+    parser.add_argument('--report-every', type=float, default=10.0, help="seconds between health reports")
+    args = parser.parse_args()
+
+    from detection_engine import DetectionConfig, get_engine
+    sources = {}
+    for i, item in enumerate(args.sources):
+        name, sep, source = item.partition('=')
+        sources[name if sep else f'cam{i}'] = source if sep else item
+
+    config = DetectionConfig.from_env()
+    config.max_batch_size = max(config.max_batch_size, args.max_batch)
+    engine = get_engine(config)
+
+    on_result = None
+    if args.store:
+        from detection_store import DetectionStore
+        store = DetectionStore(args.store)
+
+        def on_result(name, frame, detections):
+            store.add(detections, source=name)
+
+    mux = CameraMultiplexer(sources, engine.detect_batch, on_result, args.fps, args.max_batch).start()
+    print(f"📹 Serving {len(sources)} cameras from one model (Ctrl+C to stop)")
+    try:
+        while mux.running():
+            mux.join(timeout=args.report_every)
+            health = mux.health()
+            print(f"📊 {health['healthy']}/{len(sources)} healthy, avg batch {health['avg_batch_size']}")
+            for name, h in health['streams'].items():
+                print(f"   {name}: {h['state']} {h['fps']} FPS, {h['detections']} detections, "
+                      f"{h['skipped_frames']} skipped, {h['reconnects']} reconnects")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        mux.stop()
+        mux.join(timeout=2)
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,51 @@
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, Response, render_template, jsonify, request
 from flask_cors import CORS
-import cv2
-import numpy as np
-import base64
-from ultralytics import YOLO
-import io
-from PIL import Image
+from detection_api import status_api
+from detection_engine import engine_ready, engine_unavailable, get_engine, load_in_background
+from detection_ring import DetectionRing
+from detection_store import DetectionStore
+from event_stream import Broadcaster
+from geo import location_from_request, parse_bbox, tile_bbox
+from image_io import decode_image_bytes, image_bytes_from_request
+from metrics import CONTENT_TYPE, metrics
+from pothole_tracker import TrackManager
+from upload_hints import UploadHints
+import atexit
+import os
 import threading
 import time
 from datetime import datetime
 
 app = Flask(__name__)
 CORS(app)
+app.register_blueprint(status_api)  # /ready, /api/batch_stats, /api/gate_stats
 
 # Global variables for sharing data
-detection_results = []
+store = DetectionStore(os.environ.get('STREETSCAN_DB', 'detections.db'),
+                       merge_radius_m=float(os.environ.get('STREETSCAN_MERGE_RADIUS_M', 10)))
+# Hot in-memory view for /api/results, seeded from the persistent history
+recent_detections = DetectionRing(100, counts=store.counts(), recent=store.recent(100))
 live_feed_active = False
-model = YOLO('yolov8n.pt')
+load_in_background()  # Model loads and warms up while the dashboard already serves pages
+# Each open /api/stream holds a server thread; serve.py sets the cap below its thread count so viewers can't starve /detect
+stream_clients = os.environ.get('STREETSCAN_STREAM_CLIENTS')
+broadcaster = Broadcaster(max_subscribers=int(stream_clients) if stream_clients else None)
+# One event per physical pothole instead of one per frame (STREETSCAN_TRACKING=0 to store every frame)
+tracks = TrackManager(max_age=float(os.environ.get('STREETSCAN_TRACK_MAX_AGE', 1.5))) \
+    if os.environ.get('STREETSCAN_TRACKING', '1') != '0' else None
+_reaper_pid = None
+_reaper_lock = threading.Lock()
+# Upload size, quality and pacing suggested to clients from queue depth and latency
+hints = UploadHints.from_env()
+
+def parse_time(value):
+    """Epoch seconds or ISO-8601 query parameter to epoch seconds"""
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
 
 @app.route('/')
 def dashboard():
@@ -69,98 +98,218 @@ def dashboard():
     </div>
 
     <script>
+        const counts = { total: 0, high: 0, medium: 0, low: 0 };
+        let recent = [];
+        
+        function render() {
+            document.getElementById('total-count').textContent = counts.total;
+            document.getElementById('high-count').textContent = counts.high;
+            document.getElementById('medium-count').textContent = counts.medium;
+            document.getElementById('low-count').textContent = counts.low;
+            
+            const list = document.getElementById('detection-list');
+            if (recent.length === 0) {
+                list.innerHTML = 'No detections yet...';
+            } else {
+                list.innerHTML = recent.map(d => 
+                    `<div class="detection-item ${d.severity.toLowerCase()}">
+                        <strong>${d.severity} Severity Pothole</strong><br>
+                        Confidence: ${Math.round(d.confidence * 100)}%<br>
+                        Time: ${d.timestamp}
+                    </div>`
+                ).join('');
+            }
+        }
+        
         function refreshData() {
             fetch('/api/results')
                 .then(response => response.json())
                 .then(data => {
-                    document.getElementById('total-count').textContent = data.total;
-                    document.getElementById('high-count').textContent = data.high;
-                    document.getElementById('medium-count').textContent = data.medium;
-                    document.getElementById('low-count').textContent = data.low;
-                    
-                    const list = document.getElementById('detection-list');
-                    if (data.detections.length === 0) {
-                        list.innerHTML = 'No detections yet...';
-                    } else {
-                        list.innerHTML = data.detections.map(d => 
-                            `<div class="detection-item ${d.severity.toLowerCase()}">
-                                <strong>${d.severity} Severity Pothole</strong><br>
-                                Confidence: ${Math.round(d.confidence * 100)}%<br>
-                                Time: ${d.timestamp}
-                            </div>`
-                        ).join('');
-                    }
+                    Object.keys(counts).forEach(k => counts[k] = data[k]);
+                    recent = data.detections;
+                    render();
                 });
         }
         
-        // Auto-refresh every 2 seconds
-        setInterval(refreshData, 2000);
-        refreshData();
+        // Snapshot on (re)connect only (fetching it on load too could drop or double-count a delta),
+        // then apply pushed deltas
+        const events = new EventSource('/api/stream');
+        events.onopen = refreshData;
+        // Refused (no free stream slot) or server gone for good: poll instead
+        events.onerror = () => {
+            if (events.readyState === EventSource.CLOSED) {
+                refreshData();
+                setInterval(refreshData, 5000);
+            }
+        };
+        events.addEventListener('resync', refreshData);
+        events.addEventListener('detections', e => {
+            const data = JSON.parse(e.data);
+            Object.keys(counts).forEach(k => counts[k] += data.delta[k]);
+            recent = recent.concat(data.detections).slice(-10);
+            render();
+        });
     </script>
 </body>
 </html>'''
 
+def ensure_track_reaper():
+    """Start (once per process) the thread that closes potholes of cameras that stopped sending
+
+    Started lazily from /detect rather than at import: under serve.py the app is imported in the
+    master and threads don't survive the fork into workers.
+    """
+    global _reaper_pid
+    if _reaper_pid == os.getpid():
+        return
+    with _reaper_lock:
+        if _reaper_pid == os.getpid():
+            return
+        _reaper_pid = os.getpid()
+        interval = max(0.25, tracks.settings['max_age'] / 2)
+
+        def reap():
+            while True:
+                time.sleep(interval)
+                try:
+                    record_track_events(tracks.expire())
+                except Exception as e:
+                    print(f"⚠️ Track expiry failed: {e}")
+
+        threading.Thread(target=reap, name='track-reaper', daemon=True).start()
+
+def flush_tracks():
+    """Record potholes still in view when the process exits instead of losing them"""
+    if tracks is not None:
+        record_track_events(tracks.flush())
+
+atexit.register(flush_tracks)
+
 @app.route('/api/results')
 def get_results():
-    high = len([d for d in detection_results if d['severity'] == 'High'])
-    medium = len([d for d in detection_results if d['severity'] == 'Medium'])
-    low = len([d for d in detection_results if d['severity'] == 'Low'])
+    # Counters and last 10 detections, read atomically without touching the database
+    return jsonify(recent_detections.snapshot(10))
+
+@app.route('/api/stream')
+def stream_results():
+    """Server-sent events with new detections; fetch /api/results once on connect for the snapshot"""
+    q = broadcaster.subscribe()
+    if q is None:
+        # Out of stream slots: the page falls back to polling /api/results
+        return jsonify({'error': 'too many live viewers', 'max': broadcaster.max_subscribers}), 503
+    response = Response(broadcaster.stream(q), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+    response.call_on_close(lambda: broadcaster.unsubscribe(q))  # Also when the body is never iterated
+    return response
+
+@app.route('/api/detections')
+def get_detections():
+    """Paginated history: ?start=&end= (epoch or ISO), &severity=, &source=, &limit=, &cursor="""
+    try:
+        page = store.query(start=parse_time(request.args.get('start')),
+                           end=parse_time(request.args.get('end')),
+                           severity=request.args.get('severity'),
+                           source=request.args.get('source'),
+                           limit=min(int(request.args.get('limit', 100)), 1000),
+                           cursor=request.args.get('cursor', type=int))
+        return jsonify(page)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/api/map/aggregate')
+def map_aggregate():
+    """Pothole counts per geohash cell: ?bbox=min_lon,min_lat,max_lon,max_lat[&precision=1-8]"""
+    try:
+        return jsonify(store.aggregate(*parse_bbox(request.args['bbox']),
+                                       precision=request.args.get('precision', type=int)))
+    except (KeyError, ValueError) as e:
+        return jsonify({'error': f"bad or missing bbox: {e}"}), 400
+
+@app.route('/api/map/tiles/<int:z>/<int:x>/<int:y>')
+def map_tile(z, x, y):
+    """Pothole counts for one slippy-map tile, in about 16x16 cells"""
+    if not (0 <= x < 2 ** z and 0 <= y < 2 ** z):
+        return jsonify({'error': 'tile out of range'}), 400
+    return jsonify(store.aggregate(*tile_bbox(z, x, y), max_cells=256))
+
+@app.route('/api/potholes')
+def get_potholes():
+    """Merged potholes in ?bbox=min_lon,min_lat,max_lon,max_lat (&limit=, max 5000)"""
+    try:
+        return jsonify(store.potholes(*parse_bbox(request.args['bbox']),
+                                      limit=min(int(request.args.get('limit', 500)), 5000)))
+    except (KeyError, ValueError) as e:
+        return jsonify({'error': f"bad or missing bbox: {e}"}), 400
+
+def record_detections(groups):
+    """Persist (source, ts, detections) groups and push them, with counter deltas, to live viewers
+
+    ts is when the detections were seen; None means now.
+    """
+    added = []
+    for source, ts, detections in groups:
+        stored = store.add(detections, source=source, ts=ts)
+        # Keep tracking details (track_id, frames seen) on what goes out to viewers
+        added.extend(dict(d, **{k: v for k, v in original.items() if k not in d})
+                     for d, original in zip(stored, detections))
+    if not added:
+        return
     
-    return jsonify({
-        'total': len(detection_results),
-        'high': high,
-        'medium': medium,
-        'low': low,
-        'detections': detection_results[-10:]  # Last 10 detections
-    })
+    recent_detections.extend(added)
+    delta = {'total': len(added), 'high': 0, 'medium': 0, 'low': 0}
+    for d in added:
+        delta[d['severity'].lower()] += 1
+    broadcaster.publish('detections', {'detections': added, 'delta': delta})
+
+def record_track_events(finished):
+    # Stamped with when the pothole was last in view, not when its track expired
+    record_detections([(event.pop('source'), event['last_seen'], [event]) for event in finished])
 
 @app.route('/detect', methods=['POST'])
+@metrics.instrument
 def detect_potholes():
-    global detection_results
+    started = time.perf_counter()
+    if not engine_ready():
+        return jsonify(dict(engine_unavailable(), hints=hints.loading())), 503
     
     try:
-        image_data = request.json['image']
-        image_data = image_data.split(',')[1]
-        
-        image_bytes = base64.b64decode(image_data)
-        image = Image.open(io.BytesIO(image_bytes))
-        frame = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
+        # Raw JPEG body, multipart upload or legacy base64 JSON
+        with metrics.time('read'):
+            data = image_bytes_from_request(request)
+        with metrics.time('decode'):
+            frame = decode_image_bytes(data)
         
-        results = model(frame)
-        detections = []
+        # Near-identical frames from the same camera may reuse its last result (STREETSCAN_GATE_THRESHOLD)
+        source = request.args.get('source', request.remote_addr or 'default')
+        detections = get_engine().detect(frame, source=source)
         
-        for r in results:
-            boxes = r.boxes
-            if boxes is not None:
-                for box in boxes:
-                    x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
-                    conf = box.conf[0].cpu().numpy()
-                    
-                    if conf > 0.3:
-                        area_ratio = ((x2-x1) * (y2-y1)) / (frame.shape[0] * frame.shape[1])
-                        severity = "High" if area_ratio > 0.05 else "Medium" if area_ratio > 0.02 else "Low"
-                        
-                        detection = {
-                            'x': int(x1),
-                            'y': int(y1),
-                            'width': int(x2 - x1),
-                            'height': int(y2 - y1),
-                            'confidence': float(conf),
-                            'severity': severity,
-                            'timestamp': datetime.now().strftime('%H:%M:%S')
-                        }
-                        
-                        detections.append(detection)
-                        detection_results.append(detection)
+        # Vehicle position of the frame (?lat=&lon=, form fields or JSON), stored with each detection
+        location = location_from_request(request)
+        if location is not None:
+            detections = [dict(d, lat=location[0], lon=location[1]) for d in detections]
         
-        # Keep only last 100 detections
-        detection_results = detection_results[-100:]
+        with metrics.time('record'):
+            if tracks is None:
+                record_detections([(source, None, detections)])
+            else:
+                ensure_track_reaper()
+                # Detections of potholes already being tracked are only matched, not stored or pushed;
+                # a pothole is recorded once, at its peak severity, when it leaves the view
+                detections, finished = tracks.update(source, detections)
+                record_track_events(finished)
         
-        return jsonify({'detections': detections})
+        hints.observe(time.perf_counter() - started)
+        with metrics.time('serialize'):
+            return jsonify({'detections': detections, 'hints': hints.advise(get_engine())})
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/metrics')
+def prometheus_metrics():
+    """Stage latency histograms, in-flight requests, model load time and RSS of this process"""
+    return metrics.render(), 200, {'Content-Type': CONTENT_TYPE}
+
 if __name__ == '__main__':
     print("🚧 Starting Pothole Detection Dashboard...")
     print("📊 Dashboard: http://localhost:5000")
@@ -1,27 +1,21 @@
 from ultralytics import YOLO
 import cv2
 import numpy as np
+from stream_pipeline import StreamPipeline
 
-def demo_pothole_detection():
+def demo_pothole_detection(video_source=0):
     """Demo pothole detection using pre-trained YOLO"""
     
     # Use pre-trained YOLO model (no training needed)
     model = YOLO('yolov8n.pt')
     
-    # Start camera
-    cap = cv2.VideoCapture(0)
-    
     print("🚧 Pothole Detection Demo Started!")
     print("Press 'q' to quit")
     
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
-            
-        # Run detection on frame
-        results = model(frame)
-        
+    # Camera capture and inference run on their own threads
+    pipeline = StreamPipeline(video_source, lambda frame: model(frame, verbose=False))
+    
+    for frame, results in pipeline.frames():
         # Draw results
         annotated_frame = results[0].plot()
         
@@ -36,9 +30,9 @@ def demo_pothole_detection():
         if cv2.waitKey(1) & 0xFF == ord('q'):
             break
     
-    cap.release()
     cv2.destroyAllWindows()
-    print("Demo stopped!")
+    stats = pipeline.stats()
+    print(f"Demo stopped! Inference: {stats['stages']['inference']['fps']} FPS, dropped frames: {stats['dropped_frames']}")
 
 if __name__ == "__main__":
     demo_pothole_detection()
\ No newline at end of file
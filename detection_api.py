@@ -0,0 +1,83 @@
+import time
+from flask import Blueprint, request, jsonify
+from detection_engine import engine_ready, engine_status, engine_unavailable, get_engine
+from image_io import decode_image_bytes, image_bytes_from_request
+from metrics import CONTENT_TYPE, metrics
+from result_cache import ResultCache, upload_key
+from upload_hints import UploadHints
+
+# Routes shared by backend_api and simple_backend: /detect plus its cache and metrics
+api = Blueprint('detection_api', __name__)
+# Model readiness and scheduler/gate stats, also served by the dashboard
+status_api = Blueprint('status_api', __name__)
+
+# Retried and replayed uploads are answered from here without decoding (STREETSCAN_RESULT_CACHE_MB=0 disables)
+results = ResultCache.from_env()
+# Upload size, quality and pacing suggested to clients from queue depth and latency
+hints = UploadHints.from_env()
+
+@api.route('/detect', methods=['POST'])
+@metrics.instrument
+def detect_potholes():
+    started = time.perf_counter()
+    if not engine_ready():
+        return jsonify(dict(engine_unavailable(), hints=hints.loading())), 503
+
+    try:
+        # Raw JPEG body, multipart upload or legacy base64 JSON
+        with metrics.time('read'):
+            data = image_bytes_from_request(request)
+
+        # The same bytes with the same model and thresholds always give the same answer
+        engine = get_engine()
+        key = upload_key(data, engine.version) if results is not None else None
+        detections = results.get(key) if key else None
+        if detections is None:
+            # Run detection (near-identical frames from the same stream may reuse the last result)
+            source = request.args.get('source', request.remote_addr or 'default')
+            with metrics.time('decode'):
+                frame = decode_image_bytes(data)
+            detections, reused = engine.detect_gated(frame, source=source)
+            if key and not reused:  # A gate answer belongs to an earlier frame, not to these bytes
+                results.put(key, detections)
+
+        hints.observe(time.perf_counter() - started)
+        with metrics.time('serialize'):
+            return jsonify({'detections': detections, 'hints': hints.advise(engine)})
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/metrics')
+def prometheus_metrics():
+    """Stage latency histograms, in-flight requests, model load time and RSS of this process"""
+    gauges = {}
+    if results is not None:
+        stats = results.stats()
+        gauges = {'streetscan_result_cache_hits': stats['hits'] + stats['shared_hits'],
+                  'streetscan_result_cache_misses': stats['misses'],
+                  'streetscan_result_cache_bytes': stats['bytes']}
+    return metrics.render(gauges), 200, {'Content-Type': CONTENT_TYPE}
+
+@api.route('/api/cache_stats')
+def cache_stats():
+    return jsonify(results.stats() if results is not None else {'enabled': False})
+
+@status_api.route('/ready')
+def ready():
+    """Readiness probe: 200 once the model is loaded and warmed up, 503 before"""
+    status = engine_status()
+    return jsonify(status), 200 if status['ready'] else 503
+
+@status_api.route('/api/batch_stats')
+def batch_stats():
+    if not engine_ready():
+        return jsonify(engine_unavailable()), 503
+    return jsonify(get_engine().scheduler.stats())
+
+@status_api.route('/api/gate_stats')
+def gate_stats():
+    if not engine_ready():
+        return jsonify(engine_unavailable()), 503
+    engine = get_engine()
+    return jsonify(engine.gate.stats() if engine.gate else {'enabled': False})
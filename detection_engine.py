@@ -0,0 +1,264 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+import numpy as np
+from batch_scheduler import BatchScheduler
+from frame_gate import FrameGate
+from metrics import metrics
+from postprocess import build_detections, build_batch_detections, classify_severity, filter_boxes, to_records
+from tiling import Tiler, parse_roi
+
+# Artifact naming produced by export_model.py for each runtime
+RUNTIME_SUFFIXES = {
+    'pytorch': '.pt',
+    'onnx': '.onnx',
+    'onnx-int8': '_int8.onnx',
+    'openvino': '_openvino_model',
+    'openvino-int8': '_int8_openvino_model'
+}
+
+class DetectionConfig:
+    """Model and detection settings shared by every server"""
+
+    def __init__(self, model_path='pothole_detector.pt', fallback_model='yolov8n.pt', runtime='pytorch',
+                 conf_threshold=0.3, severity_thresholds=(0.01, 0.05), imgsz=640,
+                 max_batch_size=8, max_wait_ms=5, gate_threshold=0.0, gate_max_age=5.0,
+                 roi=None, tile_size=0, tile_overlap=0.2):
+        if runtime not in RUNTIME_SUFFIXES:
+            raise ValueError(f"Unknown runtime '{runtime}', expected one of {sorted(RUNTIME_SUFFIXES)}")
+
+        self.model_path = model_path
+        self.fallback_model = fallback_model
+        self.runtime = runtime
+        self.conf_threshold = conf_threshold
+        self.severity_thresholds = tuple(severity_thresholds)
+        self.imgsz = imgsz
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.gate_threshold = gate_threshold  # 0 disables frame-difference gating
+        self.gate_max_age = gate_max_age
+        self.roi = tuple(roi) if roi else None  # (x0, y0, x1, y1) frame fractions to run the model on
+        self.tile_size = tile_size  # 0 runs the ROI as one image
+        self.tile_overlap = tile_overlap
+
+    @classmethod
+    def from_env(cls, default_model='pothole_detector.pt'):
+        """Build a config from STREETSCAN_* environment variables (default_model when STREETSCAN_MODEL is unset)"""
+        env = os.environ
+        return cls(model_path=env.get('STREETSCAN_MODEL', default_model),
+                   runtime=env.get('STREETSCAN_RUNTIME', 'pytorch'),
+                   conf_threshold=float(env.get('STREETSCAN_CONF', 0.3)),
+                   imgsz=int(env.get('STREETSCAN_IMGSZ', 640)),
+                   max_batch_size=int(env.get('STREETSCAN_MAX_BATCH', 8)),
+                   max_wait_ms=float(env.get('STREETSCAN_MAX_WAIT_MS', 5)),
+                   gate_threshold=float(env.get('STREETSCAN_GATE_THRESHOLD', 0)),
+                   gate_max_age=float(env.get('STREETSCAN_GATE_MAX_AGE', 5)),
+                   roi=parse_roi(env.get('STREETSCAN_ROI')),
+                   tile_size=int(env.get('STREETSCAN_TILE_SIZE', 0)),
+                   tile_overlap=float(env.get('STREETSCAN_TILE_OVERLAP', 0.2)))
+
+    def to_dict(self):
+        return dict(vars(self))
+
+def resolve_model_path(model_path, runtime='pytorch'):
+    """Path of the exported artifact for a runtime, e.g. pothole_detector.pt -> pothole_detector_int8.onnx"""
+    if runtime == 'pytorch':
+        return model_path
+    return str(Path(model_path).with_suffix('')) + RUNTIME_SUFFIXES[runtime]
+
+def model_version(config):
+    """Short id of everything that affects results (weights file and detection settings), for cache keys"""
+    path = resolve_model_path(config.model_path, config.runtime)
+    try:
+        stat = os.stat(path)
+        weights = f"{stat.st_size}:{stat.st_mtime_ns}"
+    except OSError:
+        weights = 'missing'  # Fallback model
+    settings = json.dumps(config.to_dict(), sort_keys=True, default=str)
+    return hashlib.sha1(f"{path}:{weights}:{settings}".encode()).hexdigest()[:12]
+
+def load_model(config):
+    """Load the configured runtime variant of the trained model, falling back to the pretrained one"""
+    from ultralytics import YOLO  # Deferred: importing ultralytics/torch is most of a server's start-up time
+    path = resolve_model_path(config.model_path, config.runtime)
+    try:
+        return YOLO(path, task='detect')
+    except Exception as e:
+        print(f"⚠️ Could not load {path} ({e}); using {config.fallback_model}")
+        return YOLO(config.fallback_model)
+
+class DetectionEngine:
+    """One resident model plus the batching and post-processing around it"""
+
+    def __init__(self, config=None):
+        self.config = config or DetectionConfig.from_env()
+        self.model = load_model(self.config)
+        self.version = model_version(self.config)
+        self.scheduler = BatchScheduler(self.model,
+                                        max_batch_size=self.config.max_batch_size,
+                                        max_wait_ms=self.config.max_wait_ms,
+                                        imgsz=self.config.imgsz)
+        self.gate = FrameGate(self.config.gate_threshold, self.config.gate_max_age) \
+            if self.config.gate_threshold > 0 else None
+        self.tiler = Tiler(self.config.roi, self.config.tile_size, self.config.tile_overlap) \
+            if self.config.roi or self.config.tile_size else None
+
+    def warmup(self):
+        """Run one inference at the configured input size so the first request doesn't pay for
+        graph optimization and allocator growth
+
+        Calls the model directly, past the scheduler and the stage timers, so this slowest run
+        only shows up in the warm-up gauge and not in the /detect latency histograms.
+        """
+        frame = np.zeros((self.config.imgsz, self.config.imgsz, 3), dtype=np.uint8)
+        self.model([frame], **self.scheduler.predict_kwargs)
+
+    def predict(self, frame):
+        """Raw YOLO result for one frame, batched with concurrent callers"""
+        result = self.scheduler.predict(frame)
+        metrics.observe_speed(result)
+        return result
+
+    def predict_many(self, frames):
+        results = self.scheduler.predict_many(frames)
+        for result in results:
+            metrics.observe_speed(result)
+        return results
+
+    def detect(self, frame, source=None):
+        """Detection records for one frame
+
+        With gating enabled and a source (client stream) given, a frame nearly identical to
+        that stream's last inferred frame reuses its detections instead of running the model.
+        """
+        return self.detect_gated(frame, source)[0]
+
+    def detect_gated(self, frame, source=None):
+        """(detections, reused) for one frame; reused is True when the frame gate answered with
+        another frame's detections, which must not be cached as this frame's result"""
+        if self.gate is not None and source is not None:
+            signature, cached = self.gate.lookup(source, frame)
+            if cached is not None:
+                return cached, True
+            detections = self._infer(frame)
+            self.gate.remember(source, signature, detections)
+            return detections, False
+        return self._infer(frame), False
+
+    def _infer(self, frame):
+        if self.tiler is not None:
+            return to_records(*self.detect_boxes(frame))
+        result = self.predict(frame)
+        with metrics.time('postprocess'):
+            return build_detections(result, frame.shape, self.config.conf_threshold, self.config.severity_thresholds)
+
+    def detect_boxes(self, frame):
+        """Filtered (xyxy, confidence, severity) arrays for one frame, e.g. for drawing"""
+        if self.tiler is not None:
+            # ROI crop / tiles go through the scheduler as one batch, boxes come back in frame coordinates
+            xyxy, conf = self.tiler.merge(self.predict_many(self.tiler.crops(frame)),
+                                          frame.shape, self.config.conf_threshold)
+            return xyxy, conf, classify_severity(xyxy, frame.shape, self.config.severity_thresholds)
+
+        return filter_boxes(self.predict(frame), frame.shape,
+                            self.config.conf_threshold, self.config.severity_thresholds)
+
+    def detect_batch(self, frames):
+        """Detection records for a list of frames, batched through the shared scheduler"""
+        if self.tiler is not None:
+            crops = [self.tiler.crops(f) for f in frames]
+            results = iter(self.predict_many([c for frame_crops in crops for c in frame_crops]))
+            detections = []
+            for frame, frame_crops in zip(frames, crops):
+                xyxy, conf = self.tiler.merge([next(results) for _ in frame_crops],
+                                              frame.shape, self.config.conf_threshold)
+                severity = classify_severity(xyxy, frame.shape, self.config.severity_thresholds)
+                detections.append(to_records(xyxy, conf, severity))
+            return detections
+
+        results = self.predict_many(frames)
+        return build_batch_detections(results, [f.shape for f in frames],
+                                      self.config.conf_threshold, self.config.severity_thresholds)
+
+_engine = None
+_engine_lock = threading.Lock()
+_pending_config = None
+_module_loaded_at = time.perf_counter()
+_status = {'state': 'idle', 'error': None, 'attempts': 0, 'retry_in_s': None, 'import_s': None, 'load_s': None,
+           'warmup_s': None, 'ready_after_s': None}
+
+def _load_engine(config):
+    """Import, load and warm up the engine, recording how long each step took"""
+    _status.update(state='loading', error=None, retry_in_s=None, attempts=_status['attempts'] + 1)
+    try:
+        started = time.perf_counter()
+        import ultralytics  # noqa: F401  (timed separately from reading the weights)
+        imported = time.perf_counter()
+        engine = DetectionEngine(config)
+        loaded = time.perf_counter()
+        engine.warmup()
+        warmed = time.perf_counter()
+    except Exception as e:
+        _status.update(state='failed', error=str(e))
+        raise
+
+    _status.update(state='ready', import_s=round(imported - started, 3), load_s=round(loaded - imported, 3),
+                   warmup_s=round(warmed - loaded, 3), ready_after_s=round(warmed - _module_loaded_at, 3))
+    print(f"✅ Model ready in {warmed - started:.1f}s (import {imported - started:.1f}s, "
+          f"load {loaded - imported:.1f}s, warm-up {warmed - loaded:.1f}s)")
+    return engine
+
+def get_engine(config=None):
+    """Process-wide shared engine so every app in a process uses one resident model
+
+    Loads and warms it up on first use; callers arriving while a load is in progress
+    (including a background one) wait for it.
+    """
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = _load_engine(config or _pending_config)
+        return _engine
+
+def load_in_background(config=None, max_backoff=60.0):
+    """Start loading the shared engine on a daemon thread so the server can accept connections
+    (and answer readiness probes) meanwhile
+
+    A failed load (missing weights, out of memory...) is reported through engine_status() and
+    retried with exponential backoff until it succeeds.
+    """
+    global _pending_config
+    _pending_config = config
+
+    def load():
+        backoff = 1.0
+        while True:
+            try:
+                get_engine(config)
+                return
+            except Exception as e:
+                print(f"❌ Model load failed ({e}); retrying in {backoff:.0f}s")
+                _status.update(retry_in_s=backoff)
+                time.sleep(backoff)
+                backoff = min(backoff * 2, max_backoff)
+
+    thread = threading.Thread(target=load, name='engine-loader', daemon=True)
+    thread.start()
+    return thread
+
+def engine_ready():
+    return _engine is not None
+
+def engine_status():
+    """Lifecycle state and start-up timings for readiness endpoints"""
+    return dict(_status, ready=_engine is not None)
+
+def engine_unavailable():
+    """Error body for requests that need the model before it is usable: still loading, or failed"""
+    status = engine_status()
+    if status['state'] == 'failed':
+        return {'error': f"model failed to load: {status['error']}", 'status': status}
+    return {'error': 'model is loading', 'status': status}
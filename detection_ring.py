@@ -0,0 +1,133 @@
+import threading
+import time
+
+class DetectionRing:
+    """Fixed-capacity ring of recent detections with severity counters updated in the same step
+
+    Writers overwrite slots in place instead of copying a list, and readers get a consistent
+    snapshot (counters always match the detections recorded) from one short critical section.
+    """
+
+    def __init__(self, capacity=100, counts=None, recent=()):
+        self.capacity = capacity
+        self._slots = [None] * capacity
+        self._written = 0
+        self._lock = threading.Lock()
+
+        counts = counts or {}
+        self._counts = {'High': counts.get('high', 0), 'Medium': counts.get('medium', 0),
+                        'Low': counts.get('low', 0)}
+        self._total = counts.get('total', sum(self._counts.values()))
+
+        for detection in list(recent)[-capacity:]:
+            self._slots[self._written % capacity] = detection
+            self._written += 1
+
+    def extend(self, detections):
+        """Record one frame's detections and bump the counters under a single short lock"""
+        if not detections:
+            return
+        with self._lock:
+            for detection in detections:
+                self._slots[self._written % self.capacity] = detection
+                self._written += 1
+                self._counts[detection['severity']] += 1
+            self._total += len(detections)
+
+    def snapshot(self, limit=10):
+        """Counters plus the latest `limit` detections (oldest first), read atomically"""
+        with self._lock:
+            n = min(limit, self._written, self.capacity)
+            recent = [self._slots[i % self.capacity] for i in range(self._written - n, self._written)]
+            counts = dict(self._counts)
+            total = self._total
+
+        return {
+            'total': total,
+            'high': counts['High'],
+            'medium': counts['Medium'],
+            'low': counts['Low'],
+            'detections': recent
+        }
+
+def benchmark(writers=8, readers=8, duration=2.0, capacity=100):
+    """Hammer the ring (and the old list-rebinding approach) from concurrent writers and readers
+
+    Writes are counted exactly per writer thread; lost_detections is that count times the
+    detections per write minus the total the structure ends up holding.
+    """
+    severities = ('High', 'Medium', 'Low')
+    frame = [{'severity': severities[i % 3], 'confidence': 0.9} for i in range(3)]
+
+    def run(write, read, check, stored_total):
+        # Each thread checks the deadline itself so a busy main thread can't stretch the run
+        deadline = time.perf_counter() + duration
+        ops = {'writes': 0, 'reads': 0, 'inconsistent': 0}
+        ops_lock = threading.Lock()
+
+        def writer():
+            n = 0
+            while time.perf_counter() < deadline:
+                write(frame)
+                n += 1
+            with ops_lock:
+                ops['writes'] += n
+
+        def reader():
+            n = bad = 0
+            while time.perf_counter() < deadline:
+                if not check(read()):
+                    bad += 1
+                n += 1
+            with ops_lock:
+                ops['reads'] += n
+                ops['inconsistent'] += bad
+
+        threads = [threading.Thread(target=writer) for _ in range(writers)]
+        threads += [threading.Thread(target=reader) for _ in range(readers)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        return {
+            'writes': ops['writes'],
+            'writes_per_sec': round(ops['writes'] / duration),
+            'reads_per_sec': round(ops['reads'] / duration),
+            'inconsistent_reads': ops['inconsistent'],
+            'lost_detections': ops['writes'] * len(frame) - stored_total()
+        }
+
+    def consistent(s):
+        return s['total'] == s['high'] + s['medium'] + s['low']
+
+    ring = DetectionRing(capacity)
+    ring_result = run(ring.extend, ring.snapshot, consistent, lambda: ring.snapshot()['total'])
+
+    # Previous dashboard approach: append, rebind a truncated copy, rescan to count. Readers look the
+    # list up through the shared state on every access, as the old handler did with its module
+    # global, so a rebind between two lookups is seen. written is a plain unlocked counter.
+    state = {'results': [], 'written': 0}
+
+    def list_write(detections):
+        state['results'].extend(detections)
+        state['results'] = state['results'][-capacity:]
+        state['written'] += len(detections)
+
+    def list_read():
+        return {
+            'total': len(state['results']),
+            'high': len([d for d in state['results'] if d['severity'] == 'High']),
+            'medium': len([d for d in state['results'] if d['severity'] == 'Medium']),
+            'low': len([d for d in state['results'] if d['severity'] == 'Low']),
+            'detections': state['results'][-10:]
+        }
+
+    list_result = run(list_write, list_read, consistent, lambda: state['written'])
+
+    return {'ring': ring_result, 'list': list_result}
+
+if __name__ == "__main__":
+    results = benchmark()
+    print(f"🔁 Ring buffer: {results['ring']}")
+    print(f"📋 List rebind: {results['list']}")
@@ -0,0 +1,298 @@
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+import geo
+
+SEVERITIES = ('High', 'Medium', 'Low')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS detections (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts REAL NOT NULL,
+    source TEXT NOT NULL,
+    severity TEXT NOT NULL,
+    confidence REAL NOT NULL,
+    x INTEGER NOT NULL,
+    y INTEGER NOT NULL,
+    width INTEGER NOT NULL,
+    height INTEGER NOT NULL,
+    lat REAL,
+    lon REAL,
+    geohash TEXT,
+    pothole_id INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_detections_ts ON detections (ts);
+CREATE INDEX IF NOT EXISTS idx_detections_severity_ts ON detections (severity, ts);
+CREATE INDEX IF NOT EXISTS idx_detections_source_ts ON detections (source, ts);
+CREATE TABLE IF NOT EXISTS severity_counts (
+    severity TEXT PRIMARY KEY,
+    count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS potholes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    lat REAL NOT NULL,
+    lon REAL NOT NULL,
+    geohash TEXT NOT NULL,
+    severity TEXT NOT NULL,
+    confidence REAL NOT NULL,
+    reports INTEGER NOT NULL,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_potholes_geohash ON potholes (geohash);
+CREATE TABLE IF NOT EXISTS pothole_cells (
+    prefix TEXT PRIMARY KEY,
+    total INTEGER NOT NULL DEFAULT 0,
+    high INTEGER NOT NULL DEFAULT 0,
+    medium INTEGER NOT NULL DEFAULT 0,
+    low INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+# Columns added after the first release; older databases are migrated on open
+GEO_COLUMNS = (('lat', 'REAL'), ('lon', 'REAL'), ('geohash', 'TEXT'), ('pothole_id', 'INTEGER'))
+GEO_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_detections_geohash ON detections (geohash);
+CREATE INDEX IF NOT EXISTS idx_detections_pothole ON detections (pothole_id);
+"""
+
+GEOHASH_PRECISION = 9  # ~5 m cells for stored points
+CELL_PRECISIONS = range(1, 9)  # Pre-aggregated pothole counts from continent down to ~40 m cells
+MERGE_PRECISION = 7  # Finest search cells (~150 m) when looking for an existing pothole nearby
+SEVERITY_RANK = {'Low': 0, 'Medium': 1, 'High': 2}
+
+COLUMNS = ('id', 'ts', 'source', 'severity', 'confidence', 'x', 'y', 'width', 'height', 'lat', 'lon', 'pothole_id')
+POTHOLE_COLUMNS = ('id', 'lat', 'lon', 'severity', 'confidence', 'reports', 'first_seen', 'last_seen')
+
+def _row_to_dict(row):
+    detection = dict(zip(COLUMNS, row))
+    detection['timestamp'] = datetime.fromtimestamp(detection['ts']).strftime('%H:%M:%S')
+    return detection
+
+class DetectionStore:
+    """Append-only SQLite (WAL) detection history with severity counters kept on insert
+
+    Writes go through one connection under a lock; each reader thread gets its own
+    connection so queries never block ingestion.
+    """
+
+    def __init__(self, path='detections.db', merge_radius_m=10.0):
+        self.path = path
+        self.merge_radius_m = merge_radius_m
+        self._local = threading.local()
+        self._pid = None
+
+        writer = self._get_writer()
+        writer.executescript(SCHEMA)
+        existing = {row[1] for row in writer.execute("PRAGMA table_info(detections)")}
+        for column, kind in GEO_COLUMNS:
+            if column not in existing:
+                writer.execute(f"ALTER TABLE detections ADD COLUMN {column} {kind}")
+        writer.executescript(GEO_INDEXES)
+        writer.executemany(
+            "INSERT OR IGNORE INTO severity_counts (severity, count) VALUES (?, 0)",
+            [(s,) for s in SEVERITIES])
+        writer.commit()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _get_writer(self):
+        """Writer connection for this process; connections must not be shared across fork"""
+        if self._pid != os.getpid():
+            self._write_lock = threading.Lock()
+            self._writer = self._connect()
+            self._pid = os.getpid()
+        return self._writer
+
+    def _reader(self):
+        if getattr(self._local, 'pid', None) != os.getpid():
+            self._local.conn = self._connect()
+            self._local.pid = os.getpid()
+        return self._local.conn
+
+    def add(self, detections, source='default', ts=None):
+        """Append one frame's detections and return them with id, ts, source and timestamp
+
+        Detections carrying lat/lon are also merged into the pothole table: a report within
+        merge_radius_m of a known pothole updates it (report count, averaged position, peak
+        severity) instead of creating a new one. Each pothole is matched at most once per call,
+        since several boxes in one frame are different potholes even though they share the
+        frame's position.
+        """
+        if not detections:
+            return []
+
+        ts = time.time() if ts is None else ts
+        added = {}
+        for d in detections:
+            added[d['severity']] = added.get(d['severity'], 0) + 1
+
+        rows = []
+        writer = self._get_writer()
+        with self._write_lock, writer:
+            matched = set()
+            for d in detections:
+                lat, lon = d.get('lat'), d.get('lon')
+                geohash = pothole_id = None
+                if lat is not None and lon is not None:
+                    geohash = geo.encode(lat, lon, GEOHASH_PRECISION)
+                    pothole_id = self._merge_pothole(writer, lat, lon, d['severity'], d['confidence'], ts, matched)
+                    matched.add(pothole_id)
+
+                row = (ts, source, d['severity'], d['confidence'], d['x'], d['y'], d['width'], d['height'],
+                       lat, lon, pothole_id)
+                cursor = writer.execute(
+                    "INSERT INTO detections (ts, source, severity, confidence, x, y, width, height, "
+                    "lat, lon, pothole_id, geohash) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", row + (geohash,))
+                rows.append((cursor.lastrowid,) + row)
+            writer.executemany(
+                "UPDATE severity_counts SET count = count + ? WHERE severity = ?",
+                [(n, s) for s, n in added.items()])
+
+        return [_row_to_dict(row) for row in rows]
+
+    def _merge_pothole(self, writer, lat, lon, severity, confidence, ts, exclude=()):
+        """Attach a located report to the nearest known pothole within merge_radius_m, or create one"""
+        best = None
+        # Coarser cells for larger radii (and towards the poles, where cells narrow) so none is missed
+        precision = geo.precision_for_radius(self.merge_radius_m, lat, MERGE_PRECISION)
+        for cell in geo.neighbors(geo.encode(lat, lon, precision)):
+            for row in writer.execute(
+                    "SELECT id, lat, lon, geohash, severity, confidence, reports FROM potholes "
+                    "WHERE geohash >= ? AND geohash < ?", geo.prefix_range(cell)):
+                distance = geo.haversine_m(lat, lon, row[1], row[2])
+                if row[0] not in exclude and distance <= self.merge_radius_m and \
+                        (best is None or distance < best[0]):
+                    best = (distance, row)
+
+        if best is None:
+            geohash = geo.encode(lat, lon, GEOHASH_PRECISION)
+            cursor = writer.execute(
+                "INSERT INTO potholes (lat, lon, geohash, severity, confidence, reports, first_seen, last_seen) "
+                "VALUES (?, ?, ?, ?, ?, 1, ?, ?)", (lat, lon, geohash, severity, confidence, ts, ts))
+            self._update_cells(writer, geohash, severity, 1)
+            return cursor.lastrowid
+
+        pothole_id, old_lat, old_lon, old_geohash, old_severity, old_confidence, reports = best[1]
+        reports += 1
+        new_lat = old_lat + (lat - old_lat) / reports
+        new_lon = old_lon + (lon - old_lon) / reports
+        new_geohash = geo.encode(new_lat, new_lon, GEOHASH_PRECISION)
+        new_severity = max(old_severity, severity, key=SEVERITY_RANK.get)
+        writer.execute(
+            "UPDATE potholes SET lat = ?, lon = ?, geohash = ?, severity = ?, confidence = ?, reports = ?, "
+            "last_seen = ? WHERE id = ?",
+            (new_lat, new_lon, new_geohash, new_severity, max(old_confidence, confidence), reports, ts, pothole_id))
+
+        # Keep the pre-aggregated cells in step when the pothole moves cell or gets more severe
+        if new_severity != old_severity or \
+                new_geohash[:CELL_PRECISIONS[-1]] != old_geohash[:CELL_PRECISIONS[-1]]:
+            self._update_cells(writer, old_geohash, old_severity, -1)
+            self._update_cells(writer, new_geohash, new_severity, 1)
+        return pothole_id
+
+    def _update_cells(self, writer, geohash, severity, delta):
+        column = severity.lower()  # One of the fixed SEVERITY_RANK keys, safe to interpolate
+        writer.executemany(
+            f"INSERT INTO pothole_cells (prefix, total, {column}) VALUES (?, ?, ?) "
+            f"ON CONFLICT (prefix) DO UPDATE SET total = total + excluded.total, "
+            f"{column} = {column} + excluded.{column}",
+            [(geohash[:p], delta, delta) for p in CELL_PRECISIONS])
+
+    def counts(self):
+        """Total and per-severity counts from the counter table, independent of history size"""
+        counts = dict(self._reader().execute("SELECT severity, count FROM severity_counts"))
+        return {
+            'total': sum(counts.values()),
+            'high': counts.get('High', 0),
+            'medium': counts.get('Medium', 0),
+            'low': counts.get('Low', 0)
+        }
+
+    def recent(self, limit=10):
+        """Latest detections, oldest first"""
+        rows = self._reader().execute(
+            f"SELECT {', '.join(COLUMNS)} FROM detections ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+        return [_row_to_dict(row) for row in reversed(rows)]
+
+    def query(self, start=None, end=None, severity=None, source=None, limit=100, cursor=None):
+        """Newest-first page of detections in a time range; pass the returned cursor to get the next page"""
+        clauses, params = [], []
+        if start is not None:
+            clauses.append("ts >= ?")
+            params.append(start)
+        if end is not None:
+            clauses.append("ts < ?")
+            params.append(end)
+        if severity is not None:
+            clauses.append("severity = ?")
+            params.append(severity)
+        if source is not None:
+            clauses.append("source = ?")
+            params.append(source)
+        if cursor is not None:
+            clauses.append("id < ?")
+            params.append(cursor)
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._reader().execute(
+            f"SELECT {', '.join(COLUMNS)} FROM detections {where} ORDER BY id DESC LIMIT ?",
+            params + [limit + 1]).fetchall()
+
+        page = [_row_to_dict(row) for row in rows[:limit]]
+        next_cursor = page[-1]['id'] if len(rows) > limit else None
+        return {'detections': page, 'next_cursor': next_cursor}
+
+    def aggregate(self, min_lat, min_lon, max_lat, max_lon, precision=None, max_cells=1024):
+        """Pre-aggregated pothole counts per geohash cell overlapping a bounding box
+
+        Reads at most max_cells rows from the cell table whatever the number of potholes.
+        Cells on the edge of the box are counted whole.
+        """
+        if precision is None:
+            precision = geo.precision_for_bbox(min_lat, min_lon, max_lat, max_lon, max_cells, CELL_PRECISIONS[-1])
+        precision = max(CELL_PRECISIONS[0], min(precision, CELL_PRECISIONS[-1]))
+        if geo.count_cells(min_lat, min_lon, max_lat, max_lon, precision) > max_cells:
+            raise ValueError(f"Bounding box covers more than {max_cells} cells at precision {precision}")
+
+        cells = geo.cells_in_bbox(min_lat, min_lon, max_lat, max_lon, precision)
+        reader = self._reader()
+        rows = []
+        for i in range(0, len(cells), 500):  # Stay below SQLite's bound-parameter limit
+            chunk = cells[i:i + 500]
+            rows.extend(reader.execute(
+                f"SELECT prefix, total, high, medium, low FROM pothole_cells "
+                f"WHERE prefix IN ({', '.join('?' * len(chunk))}) AND total > 0", chunk))
+
+        result = []
+        for prefix, total, high, medium, low in rows:
+            cell_min_lat, cell_min_lon, cell_max_lat, cell_max_lon = geo.bounds(prefix)
+            result.append({
+                'geohash': prefix,
+                'lat': (cell_min_lat + cell_max_lat) / 2,
+                'lon': (cell_min_lon + cell_max_lon) / 2,
+                'bounds': [cell_min_lon, cell_min_lat, cell_max_lon, cell_max_lat],
+                'total': total, 'high': high, 'medium': medium, 'low': low
+            })
+        return {'precision': precision, 'cells': result}
+
+    def potholes(self, min_lat, min_lon, max_lat, max_lon, limit=500):
+        """Merged potholes inside a bounding box, found through geohash range scans"""
+        precision = geo.precision_for_bbox(min_lat, min_lon, max_lat, max_lon, 64, GEOHASH_PRECISION)
+        reader = self._reader()
+        found = []
+        for cell in geo.cells_in_bbox(min_lat, min_lon, max_lat, max_lon, precision):
+            found.extend(reader.execute(
+                f"SELECT {', '.join(POTHOLE_COLUMNS)} FROM potholes WHERE geohash >= ? AND geohash < ? "
+                f"AND lat BETWEEN ? AND ? AND lon BETWEEN ? AND ? LIMIT ?",
+                geo.prefix_range(cell) + (min_lat, max_lat, min_lon, max_lon, limit + 1 - len(found))))
+            if len(found) > limit:
+                break
+        return {'potholes': [dict(zip(POTHOLE_COLUMNS, row)) for row in found[:limit]],
+                'truncated': len(found) > limit}
@@ -0,0 +1,249 @@
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import cv2
+import numpy as np
+from postprocess import SEVERITY_LEVELS, box_iou, boxes_to_arrays, severity_index
+
+IOU_THRESHOLDS = np.linspace(0.5, 0.95, 10)
+IMAGE_SUFFIXES = {'.jpg', '.jpeg', '.png', '.bmp'}
+CONFUSION_LABELS = SEVERITY_LEVELS.tolist() + ['Background']
+
+def match_predictions(iou, thresholds=IOU_THRESHOLDS):
+    """COCO-style greedy one-to-one matching at every IoU threshold
+
+    Predictions must be sorted by descending confidence. In that order each prediction takes
+    the still-unmatched ground truth it overlaps most, if that IoU reaches the threshold, so a
+    confident prediction is never displaced by a later one with a higher IoU. Returns a
+    (num_preds, num_thresholds) true-positive matrix and, for the first threshold, the
+    ground-truth index matched by each prediction (-1 if none).
+    """
+    n_pred, n_gt = iou.shape
+    thresholds = np.asarray(thresholds)
+    tp = np.zeros((n_pred, len(thresholds)), dtype=bool)
+    matched_gt = np.full(n_pred, -1)
+    if n_pred == 0 or n_gt == 0:
+        return tp, matched_gt
+
+    columns = np.arange(len(thresholds))
+    gt_taken = np.zeros((len(thresholds), n_gt), dtype=bool)  # Per threshold
+    for i in range(n_pred):
+        candidates = np.where(gt_taken, -1.0, iou[i])
+        best = candidates.argmax(axis=1)
+        hit = candidates[columns, best] >= thresholds
+        tp[i] = hit
+        gt_taken[columns[hit], best[hit]] = True
+        if hit[0]:
+            matched_gt[i] = best[0]
+    return tp, matched_gt
+
+def average_precision(tp, conf, n_gt):
+    """COCO-style 101-point interpolated AP for each IoU threshold column of tp"""
+    if n_gt == 0 or len(conf) == 0:
+        return np.zeros(tp.shape[1])
+
+    order = np.argsort(-conf, kind='stable')
+    tp_cum = np.cumsum(tp[order], axis=0)
+    fp_cum = np.cumsum(~tp[order], axis=0)
+    recall = tp_cum / n_gt
+    precision = tp_cum / (tp_cum + fp_cum)
+
+    # Precision envelope (monotonically decreasing from the right)
+    envelope = np.flip(np.maximum.accumulate(np.flip(precision, axis=0), axis=0), axis=0)
+    recall_points = np.linspace(0, 1, 101)
+    ap = np.zeros(tp.shape[1])
+    for t in range(tp.shape[1]):
+        idx = np.searchsorted(recall[:, t], recall_points, side='left')
+        valid = idx < len(recall)
+        ap[t] = np.sum(envelope[idx[valid], t]) / len(recall_points)
+    return ap
+
+def load_labels(label_path, width, height):
+    """YOLO txt labels (cls cx cy w h, normalized) as pixel xyxy boxes"""
+    if not Path(label_path).exists() or os.path.getsize(label_path) == 0:
+        return np.empty((0, 4), dtype=np.float32)
+    labels = np.loadtxt(label_path, ndmin=2, dtype=np.float32)
+    cx, cy = labels[:, 1] * width, labels[:, 2] * height
+    w, h = labels[:, 3] * width, labels[:, 4] * height
+    return np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1)
+
+def label_path_for(image_path):
+    """pothole_data/images/val/x.jpg -> pothole_data/labels/val/x.txt"""
+    parts = list(Path(image_path).parts)
+    index = len(parts) - 1 - parts[::-1].index('images')
+    parts[index] = 'labels'
+    return Path(*parts).with_suffix('.txt')
+
+_model = None
+_settings = None
+
+def _init_worker(model_path, settings):
+    """Load one model per process and keep torch to a single thread so processes don't contend"""
+    global _model, _settings
+    import torch
+    from ultralytics import YOLO
+    torch.set_num_threads(1)
+    _model = YOLO(model_path, task='detect')
+    _settings = settings
+
+def _evaluate_chunk(image_paths):
+    """Run the model over a chunk of images and return compact per-prediction match data"""
+    conf_threshold = _settings['conf_threshold']
+    severity_thresholds = _settings['severity_thresholds']
+    tps, confs, n_gt = [], [], 0
+    confusion = np.zeros((len(CONFUSION_LABELS), len(CONFUSION_LABELS)), dtype=np.int64)
+    inference_time = 0.0
+
+    batch_size = _settings['batch_size']
+    for start in range(0, len(image_paths), batch_size):
+        paths = image_paths[start:start + batch_size]
+        frames = [cv2.imread(str(p)) for p in paths]
+        paths = [p for p, f in zip(paths, frames) if f is not None]
+        frames = [f for f in frames if f is not None]
+        if not frames:
+            continue
+
+        started = time.perf_counter()
+        results = _model(frames, imgsz=_settings['imgsz'], conf=0.001, iou=0.7, verbose=False)
+        inference_time += time.perf_counter() - started
+
+        for path, frame, result in zip(paths, frames, results):
+            gt = load_labels(label_path_for(path), frame.shape[1], frame.shape[0])
+            xyxy, conf = boxes_to_arrays(result)
+            order = np.argsort(-conf, kind='stable')
+            xyxy, conf = xyxy[order], conf[order]
+
+            tp, matched_gt = match_predictions(box_iou(xyxy, gt))
+            tps.append(tp)
+            confs.append(conf)
+            n_gt += len(gt)
+
+            # Severity confusion at the deployed confidence threshold and IoU 0.5
+            keep = conf > conf_threshold
+            pred_severity = severity_index(xyxy, frame.shape, severity_thresholds)
+            gt_severity = severity_index(gt, frame.shape, severity_thresholds)
+            hit = keep & (matched_gt >= 0)
+            np.add.at(confusion, (gt_severity[matched_gt[hit]], pred_severity[hit]), 1)
+            np.add.at(confusion, (len(SEVERITY_LEVELS), pred_severity[keep & (matched_gt < 0)]), 1)
+            missed = np.ones(len(gt), dtype=bool)
+            missed[matched_gt[hit]] = False
+            np.add.at(confusion, (gt_severity[missed], len(SEVERITY_LEVELS)), 1)
+
+    return {
+        'tp': np.concatenate(tps) if tps else np.zeros((0, len(IOU_THRESHOLDS)), dtype=bool),
+        'conf': np.concatenate(confs) if confs else np.zeros(0, dtype=np.float32),
+        'n_gt': n_gt,
+        'confusion': confusion,
+        'images': len(image_paths),
+        'inference_time': inference_time
+    }
+
+def summarize(tp, conf, n_gt, confusion, conf_threshold):
+    """Precision/recall/F1 at the operating threshold, mAP and severity accuracy"""
+    ap = average_precision(tp, conf, n_gt)
+    operating = conf > conf_threshold
+    true_pos = int(tp[operating, 0].sum())
+    false_pos = int(operating.sum()) - true_pos
+    false_neg = n_gt - true_pos
+
+    precision = true_pos / (true_pos + false_pos) if true_pos + false_pos else 0.0
+    recall = true_pos / n_gt if n_gt else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+
+    levels = len(SEVERITY_LEVELS)
+    matched = confusion[:levels, :levels]
+    per_class = {
+        f"{name.lower()}_accuracy": round(100 * matched[i, i] / matched[i].sum(), 1) if matched[i].sum() else 0.0
+        for i, name in enumerate(SEVERITY_LEVELS)
+    }
+    per_class['overall_classification'] = round(100 * np.trace(matched) / matched.sum(), 1) if matched.sum() else 0.0
+
+    return {
+        'model_performance': {
+            # Share of all objects and detections that are correct matches: TP / (TP + FP + FN)
+            'detection_accuracy': round(100 * true_pos / (true_pos + false_pos + false_neg), 1)
+            if true_pos + false_pos + false_neg else 0.0,
+            'false_positive_rate': round(100 * false_pos / (true_pos + false_pos), 1) if true_pos + false_pos else 0.0,
+            'false_negative_rate': round(100 * false_neg / n_gt, 1) if n_gt else 0.0,
+            'precision': round(100 * precision, 1),
+            'recall': round(100 * recall, 1),
+            'f1_score': round(100 * f1, 1),
+            'map50': round(100 * float(ap[0]), 1),
+            'map50_95': round(100 * float(ap.mean()), 1)
+        },
+        'severity_classification': per_class,
+        'severity_confusion_matrix': {
+            'labels': CONFUSION_LABELS,
+            'rows_true_cols_predicted': confusion.tolist()
+        },
+        'counts': {'true_positives': true_pos, 'false_positives': false_pos,
+                   'false_negatives': false_neg, 'ground_truth': int(n_gt)}
+    }
+
+def evaluate(model_path='pothole_detector.pt', image_dir='pothole_data/images/val', imgsz=640,
+             conf_threshold=0.3, severity_thresholds=(0.01, 0.05), workers=None, batch_size=16,
+             chunk_size=64, output='evaluation_results.json'):
+    """Evaluate a model on a labeled image folder across a process pool"""
+    images = sorted(str(p) for p in Path(image_dir).rglob('*') if p.suffix.lower() in IMAGE_SUFFIXES)
+    if not images:
+        raise FileNotFoundError(f"No images found in {image_dir}")
+
+    workers = workers or os.cpu_count() or 1
+    settings = {'imgsz': imgsz, 'conf_threshold': conf_threshold,
+                'severity_thresholds': tuple(severity_thresholds), 'batch_size': batch_size}
+    chunks = [images[i:i + chunk_size] for i in range(0, len(images), chunk_size)]
+
+    print(f"🎯 Evaluating {model_path} on {len(images)} images with {workers} processes...")
+    started = time.perf_counter()
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(model_path, settings)) as pool:
+        parts = list(pool.map(_evaluate_chunk, chunks))
+    elapsed = time.perf_counter() - started
+
+    tp = np.concatenate([p['tp'] for p in parts])
+    conf = np.concatenate([p['conf'] for p in parts])
+    confusion = sum(p['confusion'] for p in parts)
+    inference_time = sum(p['inference_time'] for p in parts)
+
+    report = summarize(tp, conf, sum(p['n_gt'] for p in parts), confusion, conf_threshold)
+    report['performance_metrics'] = {
+        'avg_fps': round(len(images) / inference_time, 1) if inference_time else 0.0,
+        'avg_processing_time': round(inference_time / len(images), 4),
+        'images_per_sec_total': round(len(images) / elapsed, 1),
+        'workers': workers
+    }
+    report['test_conditions'] = {
+        'model': str(model_path),
+        'dataset': str(image_dir),
+        'total_frames': len(images),
+        'test_duration': f"{elapsed:.1f} seconds",
+        'imgsz': imgsz,
+        'conf_threshold': conf_threshold
+    }
+
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    mp = report['model_performance']
+    print(f"📊 P {mp['precision']}%  R {mp['recall']}%  mAP50 {mp['map50']}%  mAP50-95 {mp['map50_95']}%")
+    print(f"✅ Results saved to {output} ({elapsed:.1f}s, {report['performance_metrics']['images_per_sec_total']} img/s)")
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate a pothole model on labeled validation data")
+    parser.add_argument('--model', default='pothole_detector.pt')
+    parser.add_argument('--images', default='pothole_data/images/val')
+    parser.add_argument('--imgsz', type=int, default=640)
+    parser.add_argument('--conf', type=float, default=0.3, help="operating threshold for P/R and severity")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--batch', type=int, default=16)
+    parser.add_argument('--output', default='evaluation_results.json')
+    args = parser.parse_args()
+
+    evaluate(args.model, args.images, args.imgsz, args.conf, workers=args.workers,
+             batch_size=args.batch, output=args.output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import json
+import queue
+import threading
+
+class Broadcaster:
+    """Single fan-out point for server-sent events
+
+    Each event is serialized once and pushed to every subscriber's bounded queue. A client
+    that falls behind has its backlog discarded and receives one 'resync' event instead, so
+    it refetches the snapshot rather than holding memory or stalling other subscribers.
+
+    Every open stream pins a server thread for as long as the client stays connected, so
+    max_subscribers (None for no limit) caps them below the thread count and leaves threads
+    for everything else.
+    """
+
+    def __init__(self, max_queue=100, heartbeat=15, max_subscribers=None):
+        self.max_queue = max_queue
+        self.heartbeat = heartbeat
+        self.max_subscribers = max_subscribers
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self.resyncs = 0
+
+    def subscribe(self):
+        """New subscriber queue, or None when max_subscribers streams are already open"""
+        q = queue.Queue(self.max_queue)
+        with self._lock:
+            if self.max_subscribers is not None and len(self._subscribers) >= self.max_subscribers:
+                return None
+            self._subscribers.add(q)
+        return q
+
+    def unsubscribe(self, q):
+        with self._lock:
+            self._subscribers.discard(q)
+
+    def subscriber_count(self):
+        return len(self._subscribers)
+
+    def publish(self, event, data):
+        message = f"event: {event}\ndata: {json.dumps(data)}\n\n"
+        with self._lock:
+            subscribers = list(self._subscribers)
+
+        for q in subscribers:
+            try:
+                q.put_nowait(message)
+            except queue.Full:
+                self._resync(q)
+
+    def _resync(self, q):
+        """Replace a slow client's backlog with a single resync marker"""
+        try:
+            while True:
+                q.get_nowait()
+        except queue.Empty:
+            pass
+        self.resyncs += 1
+        try:
+            q.put_nowait("event: resync\ndata: {}\n\n")
+        except queue.Full:
+            pass  # Another publisher refilled it; the client resyncs on a later overflow
+
+    def stream(self, q=None):
+        """Generator for a text/event-stream response body, for q or a new subscription"""
+        if q is None:
+            q = self.subscribe()
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    yield q.get(timeout=self.heartbeat)
+                except queue.Empty:
+                    yield ": keep-alive\n\n"  # Lets proxies and dead clients be noticed
+        finally:
+            self.unsubscribe(q)
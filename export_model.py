@@ -0,0 +1,123 @@
+import json
+import time
+from pathlib import Path
+import cv2
+import numpy as np
+from ultralytics import YOLO
+
+IMAGE_SUFFIXES = {'.jpg', '.jpeg', '.png', '.bmp'}
+
+def list_images(image_dir, limit=None):
+    """Sorted image paths in a folder"""
+    paths = sorted(p for p in Path(image_dir).glob('*') if p.suffix.lower() in IMAGE_SUFFIXES)
+    return paths[:limit] if limit else paths
+
+def letterbox_tensor(frame, imgsz=640):
+    """Resize/pad a BGR frame the way the YOLO predictor does and return a 1x3xHxW float32 tensor"""
+    h, w = frame.shape[:2]
+    scale = min(imgsz / h, imgsz / w)
+    nh, nw = int(round(h * scale)), int(round(w * scale))
+    canvas = np.full((imgsz, imgsz, 3), 114, dtype=np.uint8)
+    top, left = (imgsz - nh) // 2, (imgsz - nw) // 2
+    canvas[top:top + nh, left:left + nw] = cv2.resize(frame, (nw, nh), interpolation=cv2.INTER_LINEAR)
+    tensor = canvas[:, :, ::-1].transpose(2, 0, 1)[None]  # BGR HWC -> RGB NCHW
+    return np.ascontiguousarray(tensor, dtype=np.float32) / 255.0
+
+def export_onnx(model_path='pothole_detector.pt', imgsz=640, dynamic=True):
+    """Export an ONNX model; dynamic batch lets the server's batch scheduler feed it any batch size"""
+    return YOLO(model_path).export(format='onnx', imgsz=imgsz, dynamic=dynamic, simplify=True)
+
+def quantize_onnx_int8(onnx_path, calib_dir='pothole_data/images/val', imgsz=640, max_images=200):
+    """Static INT8 quantization of an ONNX model calibrated on validation images"""
+    import onnx
+    from onnxruntime.quantization import CalibrationDataReader, QuantFormat, QuantType, quantize_static
+
+    images = list_images(calib_dir, max_images)
+    if not images:
+        raise FileNotFoundError(f"No calibration images found in {calib_dir}")
+
+    input_name = onnx.load(onnx_path, load_external_data=False).graph.input[0].name
+
+    class ValImageReader(CalibrationDataReader):
+        def __init__(self):
+            self.paths = iter(images)
+
+        def get_next(self):
+            for path in self.paths:
+                frame = cv2.imread(str(path))
+                if frame is not None:
+                    return {input_name: letterbox_tensor(frame, imgsz)}
+            return None
+
+    output_path = str(Path(onnx_path).with_name(Path(onnx_path).stem + '_int8.onnx'))
+    quantize_static(onnx_path, output_path, ValImageReader(),
+                    quant_format=QuantFormat.QDQ,
+                    activation_type=QuantType.QUInt8,
+                    weight_type=QuantType.QInt8,
+                    per_channel=True)
+
+    # Keep the Ultralytics metadata (names, imgsz, stride) so YOLO() can load the quantized file
+    source, quantized = onnx.load(onnx_path), onnx.load(output_path)
+    del quantized.metadata_props[:]
+    quantized.metadata_props.extend(source.metadata_props)
+    onnx.save(quantized, output_path)
+    return output_path
+
+def export_openvino(model_path='pothole_detector.pt', imgsz=640, int8=False, data='pothole_dataset.yaml'):
+    """Export an OpenVINO IR model, optionally INT8-quantized with NNCF on the dataset's val split"""
+    return YOLO(model_path).export(format='openvino', imgsz=imgsz, dynamic=True, int8=int8, data=data)
+
+def export_cpu_variants(model_path='pothole_detector.pt', imgsz=640, int8=True,
+                        openvino=True, data='pothole_dataset.yaml', calib_dir='pothole_data/images/val'):
+    """Export every CPU-optimized variant of a trained model and return {name: path}"""
+    variants = {'pytorch': model_path}
+
+    onnx_path = export_onnx(model_path, imgsz)
+    variants['onnx'] = onnx_path
+    if int8:
+        variants['onnx-int8'] = quantize_onnx_int8(onnx_path, calib_dir, imgsz)
+
+    if openvino:
+        variants['openvino'] = export_openvino(model_path, imgsz)
+        if int8:
+            variants['openvino-int8'] = export_openvino(model_path, imgsz, int8=True, data=data)
+
+    return variants
+
+def benchmark_variants(variants, data='pothole_dataset.yaml', image_dir='pothole_data/images/val',
+                       imgsz=640, frames=50, output='variant_benchmark.json'):
+    """Compare fps and mAP of each exported variant on CPU"""
+    images = [cv2.imread(str(p)) for p in list_images(image_dir, frames)]
+    images = [im for im in images if im is not None]
+    if not images:
+        raise FileNotFoundError(f"No benchmark images found in {image_dir}")
+
+    report = {}
+    for name, path in variants.items():
+        model = YOLO(path, task='detect')
+        model(images[0], imgsz=imgsz, device='cpu', verbose=False)  # Warm up
+
+        start = time.perf_counter()
+        for image in images:
+            model(image, imgsz=imgsz, device='cpu', verbose=False)
+        elapsed = time.perf_counter() - start
+
+        metrics = model.val(data=data, imgsz=imgsz, batch=1, device='cpu', plots=False, verbose=False)
+        report[name] = {
+            'path': str(path),
+            'fps': round(len(images) / elapsed, 2),
+            'latency_ms': round(elapsed / len(images) * 1000, 2),
+            'map50': round(float(metrics.box.map50), 4),
+            'map50_95': round(float(metrics.box.map), 4)
+        }
+        print(f"⚡ {name}: {report[name]['fps']} FPS, mAP50-95 {report[name]['map50_95']}")
+
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    print(f"✅ Variant benchmark saved to {output}")
+    return report
+
+if __name__ == "__main__":
+    variants = export_cpu_variants('pothole_detector.pt')
+    benchmark_variants(variants)
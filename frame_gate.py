@@ -0,0 +1,70 @@
+import threading
+import time
+from collections import OrderedDict
+import cv2
+import numpy as np
+
+class FrameGate:
+    """Reuse a stream's last detections while its frames stay nearly identical
+
+    Each frame is reduced to a small blurred grayscale thumbnail and compared with the
+    thumbnail of the last frame that actually went through the model. If the mean absolute
+    difference (0-255) is below threshold the cached detections are returned instead of
+    running inference. Comparing against the last inferred frame rather than the previous
+    one means slow drift still triggers a refresh, and max_age forces one regardless.
+    """
+
+    def __init__(self, threshold=4.0, max_age=5.0, size=32, max_streams=1024):
+        self.threshold = threshold
+        self.max_age = max_age
+        self.size = size
+        self.max_streams = max_streams
+        self.streams = OrderedDict()  # source -> (signature, detections, inferred_at), LRU order
+        self.lock = threading.Lock()
+        self.checks = 0
+        self.skipped = 0
+
+    def signature(self, frame):
+        gray = frame if frame.ndim == 2 else cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        small = cv2.resize(gray, (self.size, self.size), interpolation=cv2.INTER_AREA)
+        return cv2.GaussianBlur(small, (3, 3), 0).astype(np.int16)
+
+    def lookup(self, source, frame, now=None):
+        """Return (signature, cached detections or None) for a new frame of source"""
+        now = time.time() if now is None else now
+        signature = self.signature(frame)
+        with self.lock:
+            self.checks += 1
+            entry = self.streams.get(source)
+            if entry is None:
+                return signature, None
+            self.streams.move_to_end(source)
+
+            previous, detections, inferred_at = entry
+            if previous.shape != signature.shape or now - inferred_at > self.max_age:
+                return signature, None
+            if np.abs(signature - previous).mean() >= self.threshold:
+                return signature, None
+
+            self.skipped += 1
+            return signature, detections
+
+    def remember(self, source, signature, detections, now=None):
+        """Store the result of a frame that went through the model"""
+        with self.lock:
+            self.streams[source] = (signature, detections, time.time() if now is None else now)
+            self.streams.move_to_end(source)
+            while len(self.streams) > self.max_streams:
+                self.streams.popitem(last=False)
+
+    def stats(self):
+        with self.lock:
+            return {
+                'enabled': True,
+                'threshold': self.threshold,
+                'max_age': self.max_age,
+                'streams': len(self.streams),
+                'frames': self.checks,
+                'skipped': self.skipped,
+                'skip_ratio': round(self.skipped / self.checks, 4) if self.checks else 0.0
+            }
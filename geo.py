@@ -0,0 +1,137 @@
+import math
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+EARTH_RADIUS_M = 6371000.0
+
+def encode(lat, lon, precision=9):
+    """Geohash of a point; nearby points share prefixes, so prefixes work as an ordered spatial index"""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        rng, coord = (lon_range, lon) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        value <<= 1
+        if coord >= mid:
+            value |= 1
+            rng[0] = mid
+        else:
+            rng[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits, value = 0, 0
+    return ''.join(chars)
+
+def bounds(geohash):
+    """(min_lat, min_lon, max_lat, max_lon) of a geohash cell"""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        value = BASE32.index(char)
+        for shift in range(4, -1, -1):
+            rng = lon_range if even else lat_range
+            mid = (rng[0] + rng[1]) / 2
+            if value >> shift & 1:
+                rng[0] = mid
+            else:
+                rng[1] = mid
+            even = not even
+    return lat_range[0], lon_range[0], lat_range[1], lon_range[1]
+
+def cell_size(precision):
+    """(lat, lon) size in degrees of a cell at this precision"""
+    lon_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lon_bits
+
+def precision_for_radius(radius_m, lat, max_precision=9):
+    """Finest precision whose cells are at least radius_m tall and wide at this latitude, so a
+    cell and its neighbours hold every point within radius_m"""
+    meters_per_degree = math.radians(EARTH_RADIUS_M)
+    for precision in range(max_precision, 1, -1):
+        lat_step, lon_step = cell_size(precision)
+        width = lon_step * meters_per_degree * math.cos(math.radians(lat))
+        if min(lat_step * meters_per_degree, width) >= radius_m:
+            return precision
+    return 1
+
+def neighbors(geohash):
+    """The cell and its eight neighbours, enough to find every point within a cell's width"""
+    min_lat, min_lon, max_lat, max_lon = bounds(geohash)
+    lat_step, lon_step = max_lat - min_lat, max_lon - min_lon
+    center_lat, center_lon = (min_lat + max_lat) / 2, (min_lon + max_lon) / 2
+    cells = set()
+    for dlat in (-1, 0, 1):
+        lat = center_lat + dlat * lat_step
+        if not -90 <= lat <= 90:
+            continue
+        for dlon in (-1, 0, 1):
+            lon = (center_lon + dlon * lon_step + 180) % 360 - 180
+            cells.add(encode(lat, lon, len(geohash)))
+    return sorted(cells)
+
+def prefix_range(prefix):
+    """[low, high) string range holding every geohash that starts with prefix (index-friendly)"""
+    return prefix, prefix + '~'  # '~' sorts after every base32 character
+
+def haversine_m(lat1, lon1, lat2, lon2):
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi, dlmb = phi2 - phi1, math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+def cells_in_bbox(min_lat, min_lon, max_lat, max_lon, precision):
+    """Every geohash cell of this precision that overlaps the bounding box"""
+    lat_step, lon_step = cell_size(precision)
+    lat = math.floor((min_lat + 90) / lat_step) * lat_step - 90 + lat_step / 2
+    cells = []
+    while lat - lat_step / 2 < max_lat and lat <= 90:
+        lon = math.floor((min_lon + 180) / lon_step) * lon_step - 180 + lon_step / 2
+        while lon - lon_step / 2 < max_lon and lon <= 180:
+            cells.append(encode(lat, lon, precision))
+            lon += lon_step
+        lat += lat_step
+    return cells
+
+def count_cells(min_lat, min_lon, max_lat, max_lon, precision):
+    lat_step, lon_step = cell_size(precision)
+    return (math.floor((max_lat + 90) / lat_step) - math.floor((min_lat + 90) / lat_step) + 1) * \
+           (math.floor((max_lon + 180) / lon_step) - math.floor((min_lon + 180) / lon_step) + 1)
+
+def precision_for_bbox(min_lat, min_lon, max_lat, max_lon, max_cells=1024, max_precision=8):
+    """Finest geohash precision that covers the box with at most max_cells cells"""
+    precision = 1
+    while precision < max_precision and \
+            count_cells(min_lat, min_lon, max_lat, max_lon, precision + 1) <= max_cells:
+        precision += 1
+    return precision
+
+def parse_bbox(value):
+    """'min_lon,min_lat,max_lon,max_lat' (the usual map order) to (min_lat, min_lon, max_lat, max_lon)"""
+    min_lon, min_lat, max_lon, max_lat = (float(v) for v in value.split(','))
+    if min_lat > max_lat or min_lon > max_lon:
+        raise ValueError("bbox must be min_lon,min_lat,max_lon,max_lat")
+    return min_lat, min_lon, max_lat, max_lon
+
+def tile_bbox(z, x, y):
+    """(min_lat, min_lon, max_lat, max_lon) of a Web Mercator (slippy map) tile"""
+    n = 2 ** z
+
+    def lat(row):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / n))))
+
+    return lat(y + 1), x / n * 360 - 180, lat(y), (x + 1) / n * 360 - 180
+
+def location_from_request(req):
+    """Optional (lat, lon) of the frame from query string, form fields or JSON body"""
+    values = req.args
+    if 'lat' not in values:
+        values = req.form if req.form else (req.get_json(silent=True) or {})
+    try:
+        lat, lon = float(values['lat']), float(values['lon'])
+    except (KeyError, TypeError, ValueError):
+        return None
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        return None
+    return lat, lon
@@ -0,0 +1,35 @@
+import base64
+import cv2
+import numpy as np
+
+RAW_IMAGE_TYPES = ('image/jpeg', 'image/png', 'image/webp', 'application/octet-stream')
+
+def decode_image_bytes(data):
+    """Decode encoded image bytes straight into a BGR frame with a single decode"""
+    frame = cv2.imdecode(np.frombuffer(memoryview(data), dtype=np.uint8), cv2.IMREAD_COLOR)
+    if frame is None:
+        raise ValueError("Could not decode image")
+    return frame
+
+def decode_data_url(image_data):
+    """Decode a base64 data URL (or bare base64 string) into a BGR frame"""
+    payload = image_data.rpartition(',')[2]  # Strip data:image/jpeg;base64, if present
+    return decode_image_bytes(base64.b64decode(payload))
+
+def image_bytes_from_request(req):
+    """Encoded image bytes from a raw image body, a multipart upload or the legacy JSON data URL"""
+    if req.mimetype in RAW_IMAGE_TYPES:
+        return req.get_data(cache=False)
+
+    if req.mimetype == 'multipart/form-data':
+        upload = req.files.get('image') or next(iter(req.files.values()), None)
+        if upload is None:
+            raise ValueError("Multipart request has no image file")
+        return upload.read()
+
+    # Compatibility shim for clients still posting {"image": "data:image/jpeg;base64,..."}
+    return base64.b64decode(req.json['image'].rpartition(',')[2])
+
+def frame_from_request(req):
+    """Read the frame from a raw image body, a multipart upload or the legacy JSON data URL"""
+    return decode_image_bytes(image_bytes_from_request(req))
@@ -0,0 +1,119 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+import cv2
+import numpy as np
+
+SERVE_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'serve.py')
+
+def make_jpeg(width=640, height=480, seed=0):
+    """Fixed synthetic road-like frame so every run sends identical bytes"""
+    rng = np.random.default_rng(seed)
+    frame = rng.integers(60, 120, (height, width, 3), dtype=np.uint8)
+    return cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 80])[1].tobytes()
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(round(p / 100 * (len(sorted_values) - 1))))]
+
+def run_load(url, payload, concurrency=16, duration=20.0):
+    """Closed-loop load: each client posts the next frame as soon as the previous answer arrives"""
+    deadline = time.perf_counter() + duration
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+
+    def client():
+        local, failed = [], 0
+        while time.perf_counter() < deadline:
+            request = urllib.request.Request(url, data=payload, headers={'Content-Type': 'image/jpeg'})
+            started = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request, timeout=60) as response:
+                    response.read()
+                local.append(time.perf_counter() - started)
+            except Exception:
+                failed += 1
+        with lock:
+            latencies.extend(local)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': errors[0],
+        'requests_per_sec': round(len(latencies) / elapsed, 2),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 1),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 1)
+    }
+
+def wait_until_up(url, timeout=180):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(url, timeout=2).read()
+            return True
+        except Exception:
+            time.sleep(1)
+    return False
+
+def scaling_test(app='backend_api:app', worker_counts=None, port=5055, concurrency=16, duration=20.0):
+    """Start serve.py with increasing worker counts and measure requests/sec for each"""
+    cores = os.cpu_count() or 1
+    worker_counts = worker_counts or sorted({1, 2, max(1, cores // 2), cores})
+    payload = make_jpeg()
+    report = {'cores': cores, 'app': app, 'concurrency': concurrency, 'runs': {}}
+
+    for workers in worker_counts:
+        # Every request posts the same bytes: without this the result cache would answer all but the first
+        env = dict(os.environ, STREETSCAN_RESULT_CACHE_MB='0')
+        server = subprocess.Popen([sys.executable, SERVE_SCRIPT, app, '--port', str(port),
+                                   '--workers', str(workers), '--threads', str(max(4, concurrency // workers))],
+                                  env=env)
+        try:
+            if not wait_until_up(f'http://127.0.0.1:{port}/ready'):
+                raise RuntimeError(f"Server with {workers} workers did not start")
+            run_load(f'http://127.0.0.1:{port}/detect', payload, concurrency, duration=3)  # Warm up
+            report['runs'][workers] = run_load(f'http://127.0.0.1:{port}/detect', payload, concurrency, duration)
+            print(f"⚡ {workers} workers: {report['runs'][workers]}")
+        finally:
+            server.terminate()
+            server.wait()
+
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test /detect and report requests/sec scaling with workers")
+    parser.add_argument('--url', help="test an already running server instead of starting serve.py")
+    parser.add_argument('--app', default='backend_api:app')
+    parser.add_argument('--workers', type=int, nargs='*', help="worker counts to try (default: 1, 2, cores/2, cores)")
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=20.0)
+    parser.add_argument('--output', default='load_test_results.json')
+    args = parser.parse_args()
+
+    if args.url:
+        report = run_load(args.url, make_jpeg(), args.concurrency, args.duration)
+        print(f"⚡ {report}")
+    else:
+        report = scaling_test(args.app, args.workers, concurrency=args.concurrency, duration=args.duration)
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ Results saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
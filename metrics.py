@@ -0,0 +1,168 @@
+import functools
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+# Seconds; from sub-millisecond decode/NMS up to a multi-second cold inference
+STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+_NULL_TIMER = nullcontext()
+
+class _Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense (counts per upper bound, sum, count)"""
+
+    __slots__ = ('counts', 'sum', 'count')
+
+    def __init__(self, buckets):
+        self.counts = [0] * (len(buckets) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+class _Timer:
+    __slots__ = ('metrics', 'stage', 'started')
+
+    def __init__(self, metrics, stage):
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.stage, time.perf_counter() - self.started)
+        return False
+
+class Metrics:
+    """Per-stage latency histograms and request counters, rendered in the Prometheus text format
+
+    Disabled (STREETSCAN_METRICS=0), timers are a shared no-op context and observe() returns
+    on its first line, so the hot path pays one attribute check per stage.
+    """
+
+    def __init__(self, enabled=True, buckets=STAGE_BUCKETS):
+        self.enabled = enabled
+        self.buckets = tuple(buckets)
+        self._stages = {}
+        self._counters = {}
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    def observe(self, stage, seconds):
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self._stages.get(stage)
+            if histogram is None:
+                histogram = self._stages[stage] = _Histogram(self.buckets)
+            histogram.counts[bisect_left(self.buckets, seconds)] += 1
+            histogram.sum += seconds
+            histogram.count += 1
+
+    def observe_speed(self, result):
+        """Stages ultralytics timed itself for one result (ms per image): letterbox + BGR->RGB + tensor,
+        forward pass, NMS"""
+        if not self.enabled:
+            return
+        speed = result.speed
+        for stage, key in (('preprocess', 'preprocess'), ('inference', 'inference'), ('nms', 'postprocess')):
+            if speed.get(key) is not None:
+                self.observe(stage, speed[key] / 1000)
+
+    def time(self, stage):
+        """Context manager recording the wall time of a block under stage"""
+        return _Timer(self, stage) if self.enabled else _NULL_TIMER
+
+    def inc(self, name, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+
+    def instrument(self, handler):
+        """Decorator for request handlers: in-flight gauge, total request time and responses by status"""
+        @functools.wraps(handler)
+        def wrapper(*args, **kwargs):
+            if not self.enabled:
+                return handler(*args, **kwargs)
+            with self._lock:
+                self._in_flight += 1
+            started = time.perf_counter()
+            status = 500
+            try:
+                response = handler(*args, **kwargs)
+                status = response[1] if isinstance(response, tuple) else getattr(response, 'status_code', 200)
+                return response
+            finally:
+                self.observe('request', time.perf_counter() - started)
+                self.inc('streetscan_responses_total', status=status)
+                with self._lock:
+                    self._in_flight -= 1
+        return wrapper
+
+    def render(self, gauges=None):
+        """Prometheus text exposition of everything recorded in this process, plus extra gauges"""
+        from detection_engine import engine_status, get_engine  # Deferred: detection_engine imports this module
+        lines = []
+
+        with self._lock:
+            stages = {stage: (list(h.counts), h.sum, h.count) for stage, h in self._stages.items()}
+            counters = dict(self._counters)
+            in_flight = self._in_flight
+
+        lines.append('# HELP streetscan_stage_seconds Time spent per /detect stage')
+        lines.append('# TYPE streetscan_stage_seconds histogram')
+        for stage, (counts, total, count) in sorted(stages.items()):
+            cumulative = 0
+            for bound, n in zip(self.buckets + ('+Inf',), counts):
+                cumulative += n
+                lines.append(f'streetscan_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+            lines.append(f'streetscan_stage_seconds_sum{{stage="{stage}"}} {total:.6f}')
+            lines.append(f'streetscan_stage_seconds_count{{stage="{stage}"}} {count}')
+
+        names = sorted({name for name, _ in counters})
+        for name in names:
+            lines.append(f'# TYPE {name} counter')
+            for (counter, labels), value in sorted(counters.items()):
+                if counter == name:
+                    label_text = ','.join(f'{k}="{v}"' for k, v in labels)
+                    lines.append(f'{name}{{{label_text}}} {value}' if label_text else f'{name} {value}')
+
+        status = engine_status()
+        values = {
+            'streetscan_in_flight_requests': in_flight,
+            'streetscan_model_ready': int(status['ready']),
+            'process_resident_memory_bytes': resident_memory_bytes()
+        }
+        if status['ready']:
+            values['streetscan_batch_queue_depth'] = get_engine().scheduler.queue_depth()
+        for step in ('import', 'load', 'warmup'):
+            if status.get(f'{step}_s') is not None:
+                values[f'streetscan_model_{step}_seconds'] = status[f'{step}_s']
+        values.update(gauges or {})
+        for name, value in values.items():
+            if value is not None:
+                lines.append(f'# TYPE {name} gauge')
+                lines.append(f'{name} {value}')
+        return '\n'.join(lines) + '\n'
+
+def resident_memory_bytes():
+    """Current RSS from /proc (Linux), peak RSS on other Unixes, None on Windows"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    import sys
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+# Process-wide registry shared by the engine, scheduler and every app in the process
+metrics = Metrics(enabled=os.environ.get('STREETSCAN_METRICS', '1') != '0')
@@ -0,0 +1,78 @@
+import numpy as np
+
+SEVERITY_LEVELS = np.array(['Low', 'Medium', 'High'])
+
+def boxes_to_arrays(result):
+    """Pull box corners and confidences of one YOLO result to NumPy in one transfer"""
+    boxes = result.boxes
+    if boxes is None or len(boxes) == 0:
+        return np.empty((0, 4), dtype=np.float32), np.empty(0, dtype=np.float32)
+
+    data = boxes.data.cpu().numpy()  # x1, y1, x2, y2, conf, cls
+    return data[:, :4], data[:, 4]
+
+def box_iou(a, b):
+    """Pairwise IoU between Nx4 and Mx4 xyxy boxes"""
+    lt = np.maximum(a[:, None, :2], b[None, :, :2])
+    rb = np.minimum(a[:, None, 2:], b[None, :, 2:])
+    inter = np.prod(np.clip(rb - lt, 0, None), axis=2)
+    area_a = np.prod(a[:, 2:] - a[:, :2], axis=1)
+    area_b = np.prod(b[:, 2:] - b[:, :2], axis=1)
+    return inter / (area_a[:, None] + area_b[None, :] - inter + 1e-9)
+
+def severity_index(xyxy, frame_shape, thresholds=(0.01, 0.05)):
+    """Index into SEVERITY_LEVELS from box-to-frame area ratio (Low < t0 <= Medium < t1 <= High)"""
+    areas = (xyxy[:, 2] - xyxy[:, 0]) * (xyxy[:, 3] - xyxy[:, 1])
+    ratios = areas / float(frame_shape[0] * frame_shape[1])
+    return np.searchsorted(thresholds, ratios, side='right')
+
+def classify_severity(xyxy, frame_shape, thresholds=(0.01, 0.05)):
+    """Vectorized severity labels for every box"""
+    return SEVERITY_LEVELS[severity_index(xyxy, frame_shape, thresholds)]
+
+def filter_boxes(result, frame_shape, conf_threshold=0.5, severity_thresholds=(0.01, 0.05)):
+    """Apply the confidence threshold and classify severity for every box of one frame"""
+    xyxy, conf = boxes_to_arrays(result)
+    keep = conf > conf_threshold
+    xyxy, conf = xyxy[keep], conf[keep]
+    return xyxy, conf, classify_severity(xyxy, frame_shape, severity_thresholds)
+
+def to_records(xyxy, conf, severity):
+    """Serialize filtered boxes as JSON-ready detection dicts"""
+    x = xyxy[:, 0].astype(int).tolist()
+    y = xyxy[:, 1].astype(int).tolist()
+    width = (xyxy[:, 2] - xyxy[:, 0]).astype(int).tolist()
+    height = (xyxy[:, 3] - xyxy[:, 1]).astype(int).tolist()
+
+    return [
+        {'x': bx, 'y': by, 'width': bw, 'height': bh, 'confidence': c, 'severity': s}
+        for bx, by, bw, bh, c, s in zip(x, y, width, height, conf.astype(float).tolist(), severity.tolist())
+    ]
+
+def build_detections(result, frame_shape, conf_threshold=0.5, severity_thresholds=(0.01, 0.05)):
+    """Threshold, classify and serialize one frame's YOLO result"""
+    return to_records(*filter_boxes(result, frame_shape, conf_threshold, severity_thresholds))
+
+def build_batch_detections(results, frame_shapes, conf_threshold=0.5, severity_thresholds=(0.01, 0.05)):
+    """Post-process a whole batch of results in one vectorized pass, returning records per frame"""
+    arrays = [boxes_to_arrays(r) for r in results]
+    counts = [len(conf) for _, conf in arrays]
+    if not sum(counts):
+        return [[] for _ in results]
+
+    xyxy = np.concatenate([a[0] for a in arrays])
+    conf = np.concatenate([a[1] for a in arrays])
+    frame_areas = np.repeat([float(h * w) for h, w in (s[:2] for s in frame_shapes)], counts)
+    frame_index = np.repeat(np.arange(len(results)), counts)
+
+    keep = conf > conf_threshold
+    xyxy, conf, frame_index, frame_areas = xyxy[keep], conf[keep], frame_index[keep], frame_areas[keep]
+
+    areas = (xyxy[:, 2] - xyxy[:, 0]) * (xyxy[:, 3] - xyxy[:, 1])
+    severity = SEVERITY_LEVELS[np.searchsorted(severity_thresholds, areas / frame_areas, side='right')]
+
+    records = to_records(xyxy, conf, severity)
+    per_frame = [[] for _ in results]
+    for i, record in zip(frame_index.tolist(), records):
+        per_frame[i].append(record)
+    return per_frame
@@ -0,0 +1,146 @@
+import itertools
+import threading
+import time
+import numpy as np
+from postprocess import box_iou
+
+SEVERITY_RANK = {'Low': 0, 'Medium': 1, 'High': 2}
+
+class Track:
+    """One physical pothole followed across frames"""
+
+    def __init__(self, track_id, box, record, now):
+        self.id = track_id
+        self.box = box
+        self.velocity = np.zeros(4)  # px/s for each corner coordinate
+        self.first_seen = now
+        self.last_seen = now
+        self.hits = 1
+        self.peak = record
+
+    def predict(self, now):
+        """Constant-velocity guess of where the box is now"""
+        return self.box + self.velocity * (now - self.last_seen)
+
+    def update(self, box, record, now, smoothing=0.5):
+        dt = now - self.last_seen
+        if dt > 0:
+            self.velocity = smoothing * self.velocity + (1 - smoothing) * (box - self.box) / dt
+        self.box = box
+        self.last_seen = now
+        self.hits += 1
+        if (SEVERITY_RANK[record['severity']], record['confidence']) > \
+                (SEVERITY_RANK[self.peak['severity']], self.peak['confidence']):
+            self.peak = record
+
+    def event(self):
+        """The pothole summarized as one detection at its peak severity"""
+        return dict(self.peak, track_id=self.id, frames=self.hits,
+                    first_seen=self.first_seen, last_seen=self.last_seen)
+
+class IoUTracker:
+    """Greedy IoU association with constant-velocity prediction for one camera stream
+
+    Ages are in seconds rather than frames so clients posting at different rates behave the
+    same. Tracks seen fewer than min_hits times are treated as noise and never reported.
+    """
+
+    def __init__(self, iou_threshold=0.3, max_age=1.5, min_hits=2, ids=None):
+        self.iou_threshold = iou_threshold
+        self.max_age = max_age
+        self.min_hits = min_hits
+        self.ids = ids or itertools.count(1)
+        self.tracks = []
+
+    def update(self, detections, now=None):
+        """Match one frame's detections to tracks
+
+        Returns the track id of every detection (in order) and the events of tracks that
+        ended, i.e. were not seen for max_age seconds.
+        """
+        now = time.time() if now is None else now
+        finished = self.expire(now)
+        track_ids = [None] * len(detections)
+        if not detections:
+            return track_ids, finished
+
+        boxes = np.array([[d['x'], d['y'], d['x'] + d['width'], d['y'] + d['height']]
+                          for d in detections], dtype=np.float64)
+
+        unmatched = set(range(len(detections)))
+        if self.tracks:
+            iou = box_iou(np.array([t.predict(now) for t in self.tracks]), boxes)
+            track_idx, det_idx = np.nonzero(iou >= self.iou_threshold)
+            order = np.argsort(-iou[track_idx, det_idx], kind='stable')
+            used_tracks = set()
+            for t, d in zip(track_idx[order].tolist(), det_idx[order].tolist()):
+                if t in used_tracks or d not in unmatched:
+                    continue
+                used_tracks.add(t)
+                unmatched.discard(d)
+                self.tracks[t].update(boxes[d], detections[d], now)
+                track_ids[d] = self.tracks[t].id
+
+        for d in sorted(unmatched):
+            track = Track(next(self.ids), boxes[d], detections[d], now)
+            self.tracks.append(track)
+            track_ids[d] = track.id
+
+        return track_ids, finished
+
+    def expire(self, now=None):
+        """Drop tracks not seen for max_age seconds and return events for the confirmed ones"""
+        now = time.time() if now is None else now
+        alive, finished = [], []
+        for track in self.tracks:
+            if now - track.last_seen <= self.max_age:
+                alive.append(track)
+            elif track.hits >= self.min_hits:
+                finished.append(track.event())
+        self.tracks = alive
+        return finished
+
+class TrackManager:
+    """One IoUTracker per source (camera / client), safe to call from request threads"""
+
+    def __init__(self, iou_threshold=0.3, max_age=1.5, min_hits=2):
+        self.settings = {'iou_threshold': iou_threshold, 'max_age': max_age, 'min_hits': min_hits}
+        self.ids = itertools.count(1)  # Shared so track ids are unique across sources
+        self.trackers = {}
+        self.lock = threading.Lock()
+
+    def update(self, source, detections, now=None):
+        """Tag detections with track ids; returns finished pothole events (with their source) from every source"""
+        now = time.time() if now is None else now
+        with self.lock:
+            tracker = self.trackers.get(source)
+            if tracker is None:
+                tracker = self.trackers[source] = IoUTracker(ids=self.ids, **self.settings)
+            track_ids, finished = tracker.update(detections, now)
+            finished = [dict(e, source=source) for e in finished] + self._expire_others(source, now)
+
+        tracked = [dict(d, track_id=track_id) for d, track_id in zip(detections, track_ids)]
+        return tracked, finished
+
+    def expire(self, now=None):
+        """Close tracks of sources that stopped sending frames"""
+        with self.lock:
+            return self._expire_others(None, time.time() if now is None else now)
+
+    def flush(self):
+        """Close every open track regardless of age (shutdown), recording the confirmed ones"""
+        return self.expire(now=float('inf'))
+
+    def _expire_others(self, skip, now):
+        finished = []
+        for source, tracker in list(self.trackers.items()):
+            if source == skip:
+                continue
+            finished.extend(dict(e, source=source) for e in tracker.expire(now))
+            if not tracker.tracks:
+                del self.trackers[source]
+        return finished
+
+    def active_tracks(self):
+        with self.lock:
+            return sum(len(t.tracks) for t in self.trackers.values())
@@ -1,25 +1,32 @@
+import argparse
+import hashlib
 import os
-import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
+import cv2
+import numpy as np
+from batch_process import find_videos, plan_jobs, read_frames
+from postprocess import boxes_to_arrays
 
-def setup_dataset_structure():
+def setup_dataset_structure(base_path="pothole_data"):
     """Create YOLO dataset folder structure"""
-    
-    base_path = Path("pothole_data")
-    
+
+    base_path = Path(base_path)
+
     # Create directories
     dirs = [
         "images/train",
-        "images/val", 
+        "images/val",
         "labels/train",
         "labels/val"
     ]
-    
+
     for dir_path in dirs:
         (base_path / dir_path).mkdir(parents=True, exist_ok=True)
-    
+
     print("Dataset structure created:")
-    print("pothole_data/")
+    print(f"{base_path}/")
     print("├── images/")
     print("│   ├── train/")
     print("│   └── val/")
@@ -33,9 +40,187 @@ def download_sample_data():
     print("1. Search Kaggle: 'Pothole Detection Dataset'")
     print("2. Download RDD2022 dataset")
     print("3. Use your phone to record road videos")
-    print("4. Extract frames: ffmpeg -i video.mp4 -vf fps=1 frame_%04d.jpg")
-    print("5. Label using LabelImg tool")
+    print("4. Build a dataset from them: python prepare_data.py videos/ --prelabel pothole_detector.pt")
+    print("5. Review and correct the labels using LabelImg tool")
+
+def dhash(frame, size=8):
+    """64-bit difference hash: near-identical frames differ in only a few bits"""
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+    small = cv2.resize(gray, (size + 1, size), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).ravel()
+    return int(np.packbits(bits).view('>u8')[0])
+
+class DuplicateIndex:
+    """Finds hashes within max_distance bits of one already seen, without comparing against all of them
+
+    The 64 bits are split into max_distance + 1 bands; two hashes that close must agree exactly on
+    at least one band, so only hashes sharing a band value are compared.
+    """
+
+    def __init__(self, max_distance=4):
+        self.max_distance = max_distance
+        bands = max_distance + 1
+        edges = [64 * i // bands for i in range(bands + 1)]
+        self.masks = [((1 << (hi - lo)) - 1) << lo for lo, hi in zip(edges[:-1], edges[1:])]
+        self.buckets = [{} for _ in self.masks]
+
+    def add(self, h):
+        """True and remember h if it is new, False if it is a near-duplicate"""
+        for mask, bucket in zip(self.masks, self.buckets):
+            for other in bucket.get(h & mask, ()):
+                if bin(h ^ other).count('1') <= self.max_distance:
+                    return False
+        for mask, bucket in zip(self.masks, self.buckets):
+            bucket.setdefault(h & mask, []).append(h)
+        return True
+
+def assign_split(key, val_fraction=0.2):
+    """Deterministic train/val split from a hash, stable across runs and machines"""
+    value = int(hashlib.sha1(key.encode()).hexdigest()[:8], 16) / 0xFFFFFFFF
+    return 'val' if value < val_fraction else 'train'
+
+def video_key(video):
+    return hashlib.sha1(os.path.abspath(video).encode()).hexdigest()[:8]
+
+def _init_worker(settings):
+    """Load the pre-labelling model once per process, with an even share of the cores"""
+    global _model, _settings
+    _settings = settings
+    _model = None
+    if settings['prelabel']:
+        from detection_engine import DetectionConfig, load_model
+        from serve import configure_torch_threads
+        configure_torch_threads(settings['torch_threads'])
+        _model = load_model(DetectionConfig(model_path=settings['prelabel']))
+
+def write_labels(path, xyxy, shape):
+    """YOLO label file (class cx cy w h, normalized) from pixel boxes"""
+    height, width = shape[:2]
+    lines = []
+    for x1, y1, x2, y2 in xyxy.tolist():
+        lines.append(f"0 {(x1 + x2) / 2 / width:.6f} {(y1 + y2) / 2 / height:.6f} "
+                     f"{(x2 - x1) / width:.6f} {(y2 - y1) / height:.6f}")
+    with open(path, 'w') as f:
+        f.write('\n'.join(lines) + ('\n' if lines else ''))
+
+def _extract_job(job):
+    """Extract, dedup (within the chunk) and optionally pre-label one frame range of a video"""
+    video, start, end = job
+    s = _settings
+    cap = cv2.VideoCapture(video)
+    video_fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    cap.release()
+    stride = max(1, round(video_fps / s['fps']))
+    segment_frames = max(1, int(video_fps * s['segment_seconds']))
+    key, stem = video_key(video), Path(video).stem
+
+    seen = DuplicateIndex(s['max_distance'])
+    kept, batch = [], []
+
+    def flush():
+        if _model is not None:
+            results = _model([frame for _, frame in batch], imgsz=s['imgsz'], verbose=False)
+        else:
+            results = [None] * len(batch)
+        for (item, frame), result in zip(batch, results):
+            cv2.imwrite(item['image'], frame, [cv2.IMWRITE_JPEG_QUALITY, s['quality']])
+            if result is not None:
+                xyxy, conf = boxes_to_arrays(result)
+                write_labels(item['label'], xyxy[conf >= s['conf_threshold']], frame.shape)
+            kept.append(item)
+
+    for index, frame in read_frames(video, start, end, stride):
+        h = dhash(frame)
+        if not seen.add(h):
+            continue  # Car stopped at a light, etc.
+        # Frames of the same stretch of road go to the same split so val never sees train's near-twins
+        split = assign_split(f"{key}:{index // segment_frames}", s['val_fraction'])
+        name = f"{stem}_{key}_{index:08d}"
+        batch.append(({'image': os.path.join(s['output'], 'images', split, name + '.jpg'),
+                       'label': os.path.join(s['output'], 'labels', split, name + '.txt'),
+                       'hash': h, 'split': split, 'video': video, 'frame': index}, frame))
+        if len(batch) == s['batch_size']:
+            flush()
+            batch = []
+    if batch:
+        flush()
+    return {'video': video, 'start': start, 'end': end, 'frames': kept}
+
+def build_dataset(inputs, output='pothole_data', fps=1.0, max_distance=4, val_fraction=0.2, prelabel=None,
+                  conf_threshold=0.4, workers=None, batch_size=16, imgsz=640, quality=95, segment_seconds=30,
+                  chunk_frames=9000):
+    """Turn a folder of dashcam videos into a deduplicated, optionally pre-labelled YOLO dataset"""
+    from serve import torch_threads_per_worker
+    videos = find_videos(inputs)
+    if not videos:
+        raise FileNotFoundError(f"No videos found in {inputs}")
+    setup_dataset_structure(output)
+
+    jobs = plan_jobs(videos, chunk_frames)
+    cores = os.cpu_count() or 1
+    workers = min(workers or cores, len(jobs))
+    settings = {'output': output, 'fps': fps, 'max_distance': max_distance, 'val_fraction': val_fraction,
+                'prelabel': prelabel, 'conf_threshold': conf_threshold, 'batch_size': batch_size,
+                'imgsz': imgsz, 'quality': quality, 'segment_seconds': segment_seconds,
+                'torch_threads': torch_threads_per_worker(workers, cores)}
+
+    print(f"🎬 Extracting ~{fps} frames/s from {len(videos)} videos ({len(jobs)} chunks, {workers} processes)"
+          + (f", pre-labelling with {prelabel}" if prelabel else ""))
+    started = time.perf_counter()
+    parts = []
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(settings,)) as pool:
+        futures = [pool.submit(_extract_job, job) for job in jobs]
+        for done, future in enumerate(as_completed(futures), 1):
+            part = future.result()
+            parts.append(part)
+            print(f"✅ [{done}/{len(jobs)}] {Path(part['video']).name} {part['start']}-{part['end']}: "
+                  f"{len(part['frames'])} frames")
+
+    # Chunks were only deduplicated internally; dedup across chunks and videos in a fixed order
+    seen = DuplicateIndex(max_distance)
+    counts = {'train': 0, 'val': 0}
+    extracted = duplicates = 0
+    for item in sorted((f for p in parts for f in p['frames']), key=lambda f: (f['video'], f['frame'])):
+        extracted += 1
+        if seen.add(item['hash']):
+            counts[item['split']] += 1
+            continue
+        duplicates += 1
+        for path in (item['image'], item['label']):
+            if os.path.exists(path):
+                os.remove(path)
+    elapsed = time.perf_counter() - started
+
+    print(f"📊 {counts['train']} train / {counts['val']} val frames in {elapsed:.1f}s "
+          f"({duplicates} cross-chunk duplicates removed) -> {output}")
+    return {'videos': len(videos), 'extracted': extracted, 'duplicates': duplicates,
+            'train': counts['train'], 'val': counts['val'], 'elapsed_s': round(elapsed, 1)}
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a YOLO pothole dataset from dashcam videos")
+    parser.add_argument('inputs', nargs='*', help="video files and/or directories (omit to just create folders)")
+    parser.add_argument('--output', default='pothole_data')
+    parser.add_argument('--fps', type=float, default=1.0, help="frames to extract per second of video")
+    parser.add_argument('--max-distance', type=int, default=4,
+                        help="perceptual hash bits within which frames count as duplicates")
+    parser.add_argument('--val-fraction', type=float, default=0.2)
+    parser.add_argument('--prelabel', help="model to pre-label frames with, e.g. pothole_detector.pt")
+    parser.add_argument('--conf', type=float, default=0.4, help="confidence for pre-labelled boxes")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--batch', type=int, default=16)
+    parser.add_argument('--imgsz', type=int, default=640)
+    parser.add_argument('--quality', type=int, default=95, help="JPEG quality")
+    parser.add_argument('--segment-seconds', type=float, default=30,
+                        help="stretch of video kept together on one side of the split")
+    args = parser.parse_args()
+
+    if not args.inputs:
+        setup_dataset_structure(args.output)
+        download_sample_data()
+        return
+
+    build_dataset(args.inputs, args.output, args.fps, args.max_distance, args.val_fraction, args.prelabel,
+                  args.conf, args.workers, args.batch, args.imgsz, args.quality, args.segment_seconds)
 
 if __name__ == "__main__":
-    setup_dataset_structure()
-    download_sample_data()
\ No newline at end of file
+    main()
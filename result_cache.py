@@ -0,0 +1,133 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+ENTRY_OVERHEAD = 128  # Rough per-entry bookkeeping (key, tuple, dict slot) counted against the byte bound
+
+def upload_key(data, version):
+    """Fast content hash of the raw upload plus the model/threshold version it was inferred with"""
+    digest = hashlib.blake2b(memoryview(data), digest_size=16)
+    digest.update(version.encode())
+    return digest.hexdigest()
+
+class RedisBackend:
+    """Shared second tier so every worker process (and host) benefits from each other's results"""
+
+    def __init__(self, url, prefix='streetscan:result:'):
+        import redis  # Optional: only needed when STREETSCAN_RESULT_CACHE_URL is set
+        self.client = redis.Redis.from_url(url, socket_timeout=0.05)
+        self.prefix = prefix
+
+    def get(self, key):
+        return self.client.get(self.prefix + key)
+
+    def set(self, key, value, ttl):
+        self.client.set(self.prefix + key, value, ex=max(1, int(ttl)))
+
+class ResultCache:
+    """LRU + TTL cache of detection results keyed on upload content, bounded in bytes
+
+    Results are kept JSON-encoded, which is what both the byte bound and a shared backend need.
+    A local hit is answered from this process; a miss falls through to the optional shared
+    backend, whose hits are copied into the local tier. Backend errors are counted, never raised.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, ttl=300.0, shared=None):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.shared = shared
+        self._entries = OrderedDict()  # key -> (expires_at, encoded)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.shared_errors = 0
+
+    @classmethod
+    def from_env(cls):
+        """Build from STREETSCAN_RESULT_CACHE_* variables; None when disabled (size 0)"""
+        env = os.environ
+        max_mb = float(env.get('STREETSCAN_RESULT_CACHE_MB', 64))
+        if max_mb <= 0:
+            return None
+        url = env.get('STREETSCAN_RESULT_CACHE_URL')
+        return cls(int(max_mb * 1024 * 1024), float(env.get('STREETSCAN_RESULT_CACHE_TTL', 300)),
+                   RedisBackend(url) if url else None)
+
+    def get(self, key):
+        """Cached detections for key, or None"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return json.loads(entry[1])
+                self._remove(key)
+
+        if self.shared is not None:
+            try:
+                encoded = self.shared.get(key)
+            except Exception:
+                encoded = None
+                self.shared_errors += 1
+            if encoded is not None:
+                with self._lock:
+                    self.shared_hits += 1
+                    self._store(key, encoded, now)
+                return json.loads(encoded)
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, detections):
+        encoded = json.dumps(detections, separators=(',', ':')).encode()
+        with self._lock:
+            self._store(key, encoded, time.monotonic())
+        if self.shared is not None:
+            try:
+                self.shared.set(key, encoded, self.ttl)
+            except Exception:
+                self.shared_errors += 1
+
+    def _store(self, key, encoded, now):
+        size = len(encoded) + ENTRY_OVERHEAD
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (now + self.ttl, encoded)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key):
+        _, encoded = self._entries.pop(key)
+        self._bytes -= len(encoded) + ENTRY_OVERHEAD
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.shared_hits + self.misses
+            return {
+                'enabled': True,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'shared_hits': self.shared_hits,
+                'misses': self.misses,
+                'hit_ratio': round((self.hits + self.shared_hits) / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'shared': self.shared is not None,
+                'shared_errors': self.shared_errors
+            }
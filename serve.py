@@ -0,0 +1,100 @@
+import argparse
+import gc
+import importlib
+import os
+
+def torch_threads_per_worker(workers, cores=None):
+    """Split the machine's cores between workers so their intra-op pools don't oversubscribe"""
+    cores = cores or os.cpu_count() or 1
+    return max(1, cores // workers)
+
+def configure_torch_threads(threads):
+    """Limit torch/OpenMP intra-op threads in this process"""
+    import torch
+    torch.set_num_threads(threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass  # Already fixed once parallel work has started in this process
+
+def stream_slots(threads, reserved=8):
+    """Threads per worker the dashboard may give to /api/stream viewers, keeping reserved for requests"""
+    return max(0, threads - reserved)
+
+def import_app(app_uri):
+    module_name, _, attr = app_uri.partition(':')
+    return getattr(importlib.import_module(module_name), attr or 'app')
+
+def serve_gunicorn(app_uri, workers, threads, torch_threads, host, port, timeout):
+    """Pre-fork server: the model is loaded once in the master and shared copy-on-write by every worker"""
+    from gunicorn.app.base import BaseApplication
+
+    class StreetScanServer(BaseApplication):
+        def load_config(self):
+            self.cfg.set('bind', f'{host}:{port}')
+            self.cfg.set('workers', workers)
+            self.cfg.set('threads', threads)
+            self.cfg.set('worker_class', 'gthread')
+            self.cfg.set('preload_app', True)
+            self.cfg.set('timeout', timeout)
+            self.cfg.set('post_fork', lambda server, worker: configure_torch_threads(torch_threads))
+
+        def load(self):
+            app = import_app(app_uri)
+            # Finish the (background) model load and warm-up before forking so every worker
+            # starts ready and shares the weights
+            from detection_engine import get_engine
+            get_engine()
+            # Move everything loaded so far (model weights included) out of the GC's reach so
+            # collections in the workers don't write to, and un-share, those pages
+            gc.collect()
+            gc.freeze()
+            return app
+
+    StreetScanServer().run()
+
+def serve_waitress(app_uri, threads, torch_threads, host, port):
+    """Single-process fallback where fork isn't available (Windows)"""
+    from waitress import serve
+    configure_torch_threads(torch_threads)
+    serve(import_app(app_uri), host=host, port=port, threads=threads)
+
+def main():
+    parser = argparse.ArgumentParser(description="Production server for the StreetScan Flask apps")
+    parser.add_argument('app', nargs='?', default='backend_api:app', help="module:app to serve")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('STREETSCAN_WORKERS', 2)))
+    parser.add_argument('--threads', type=int, default=os.environ.get('STREETSCAN_THREADS'),
+                        help="request threads per worker (they share the worker's batch scheduler; "
+                             "default 8, 64 for the dashboard)")
+    parser.add_argument('--torch-threads', type=int, default=None,
+                        help="intra-op threads per worker (default: cores // workers)")
+    parser.add_argument('--timeout', type=int, default=60)
+    args = parser.parse_args()
+
+    torch_threads = args.torch_threads or torch_threads_per_worker(args.workers)
+    # Must be set before torch is imported for the OpenMP pool to pick it up
+    os.environ.setdefault('OMP_NUM_THREADS', str(torch_threads))
+
+    dashboard = args.app.startswith('dashboard')
+    # Every /api/stream viewer holds a thread for as long as the page is open
+    args.threads = args.threads or (64 if dashboard else 8)
+    if dashboard:
+        if args.workers > 1:
+            print("⚠️ Dashboard counters and the live stream are per worker; use --workers 1 for the dashboard")
+        slots = stream_slots(args.threads)
+        os.environ.setdefault('STREETSCAN_STREAM_CLIENTS', str(slots))
+        if slots == 0:
+            print("⚠️ Too few threads for live viewers; /api/stream is refused and pages poll instead")
+
+    print(f"🚀 Serving {args.app} on {args.host}:{args.port} "
+          f"({args.workers} workers x {args.threads} threads, {torch_threads} torch threads each)")
+
+    if os.name == 'nt':
+        serve_waitress(args.app, args.threads, torch_threads, args.host, args.port)
+    else:
+        serve_gunicorn(args.app, args.workers, args.threads, torch_threads, args.host, args.port, args.timeout)
+
+if __name__ == "__main__":
+    main()
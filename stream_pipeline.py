@@ -0,0 +1,204 @@
+import queue
+import threading
+import time
+import cv2
+
+_END = object()
+
+def is_live_source(source):
+    """Cameras and network streams are live; anything else is treated as a file"""
+    if isinstance(source, int) or str(source).isdigit():
+        return True
+    return str(source).lower().startswith(('rtsp://', 'rtmp://', 'http://', 'https://', 'udp://'))
+
+def open_capture(source):
+    """cv2.VideoCapture for a camera index, RTSP/HTTP URL or file path"""
+    if isinstance(source, str) and source.isdigit():
+        source = int(source)
+    cap = cv2.VideoCapture(source)
+    if is_live_source(source):
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # Don't let the driver queue stale frames
+    return cap
+
+class LatestFrameQueue:
+    """Single-slot queue where a new item replaces an unconsumed one ("latest frame wins")"""
+
+    def __init__(self):
+        self._item = None
+        self._has_item = False
+        self._closed = False
+        self._cond = threading.Condition()
+        self.dropped = 0
+
+    def put(self, item):
+        with self._cond:
+            if item is _END:
+                # End of stream never replaces the last real frame
+                self._closed = True
+            else:
+                if self._has_item:
+                    self.dropped += 1
+                self._item, self._has_item = item, True
+            self._cond.notify()
+
+    def full(self):
+        return self._has_item
+
+    def get(self, timeout=None):
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._has_item or self._closed, timeout):
+                raise queue.Empty
+            if not self._has_item:
+                return _END
+            item, self._item, self._has_item = self._item, None, False
+            return item
+
+class _StageStats:
+    def __init__(self):
+        self.count = 0
+        self.busy = 0.0
+
+    def record(self, started):
+        self.count += 1
+        self.busy += time.perf_counter() - started
+
+class StreamPipeline:
+    """Capture -> inference -> render stages on separate threads joined by bounded queues
+
+    Live sources use latest-frame-wins queues and skip decoding frames that would only be
+    dropped; file sources use blocking queues so every frame is processed.
+    """
+
+    def __init__(self, source, infer_fn, render_fn=None, live=None, queue_size=4):
+        self.source = source
+        self.infer_fn = infer_fn
+        self.render_fn = render_fn
+        self.live = is_live_source(source) if live is None else live
+
+        if self.live:
+            self._infer_queue, self._render_queue = LatestFrameQueue(), LatestFrameQueue()
+        else:
+            self._infer_queue, self._render_queue = queue.Queue(queue_size), queue.Queue(queue_size)
+
+        self._stop = threading.Event()
+        self._stats = {name: _StageStats() for name in ('capture', 'decode', 'inference', 'render')}
+        self._capture_dropped = 0
+        self._started_at = None
+        self._finished_at = None
+
+    def _put(self, q, item):
+        """Blocking put that still gives up when the pipeline is stopped"""
+        if isinstance(q, LatestFrameQueue):
+            q.put(item)
+            return True
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q):
+        while not self._stop.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _END
+
+    def _capture_loop(self):
+        cap = open_capture(self.source)
+        try:
+            while not self._stop.is_set():
+                started = time.perf_counter()
+                if not cap.grab():
+                    break
+                self._stats['capture'].record(started)
+
+                if self.live and self._infer_queue.full():
+                    # Inference is behind: skip decoding a frame that would be replaced anyway
+                    self._capture_dropped += 1
+                    continue
+
+                started = time.perf_counter()
+                ok, frame = cap.retrieve()
+                if not ok:
+                    break
+                self._stats['decode'].record(started)
+
+                if not self._put(self._infer_queue, frame):
+                    break
+        finally:
+            cap.release()
+            self._put(self._infer_queue, _END)
+
+    def _inference_loop(self):
+        while True:
+            frame = self._get(self._infer_queue)
+            if frame is _END:
+                break
+
+            started = time.perf_counter()
+            result = self.infer_fn(frame)
+            self._stats['inference'].record(started)
+
+            if not self._put(self._render_queue, (frame, result)):
+                break
+        self._put(self._render_queue, _END)
+
+    def frames(self):
+        """Yield (frame, result) pairs in the calling thread until the source ends or stop() is called"""
+        self._started_at = time.perf_counter()
+        workers = [threading.Thread(target=self._capture_loop, name='stream-capture', daemon=True),
+                   threading.Thread(target=self._inference_loop, name='stream-inference', daemon=True)]
+        for worker in workers:
+            worker.start()
+
+        try:
+            while True:
+                item = self._get(self._render_queue)
+                if item is _END:
+                    break
+                started = time.perf_counter()
+                yield item
+                self._stats['render'].record(started)
+        finally:
+            self.stop()
+            self._finished_at = time.perf_counter()
+            for worker in workers:
+                worker.join(timeout=2)
+
+    def run(self):
+        """Render every result with render_fn (run on this thread, e.g. for cv2.imshow); it returns False to stop"""
+        for frame, result in self.frames():
+            if self.render_fn is not None and self.render_fn(frame, result) is False:
+                break
+        return self.stats()
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self):
+        """Per-stage frame counts and throughput plus dropped-frame counts"""
+        if self._started_at is None:
+            elapsed = 0.0
+        else:
+            elapsed = (self._finished_at or time.perf_counter()) - self._started_at
+        dropped = self._capture_dropped
+        if self.live:
+            dropped += self._infer_queue.dropped + self._render_queue.dropped
+
+        return {
+            'mode': 'live' if self.live else 'lossless',
+            'elapsed': round(elapsed, 2),
+            'dropped_frames': dropped,
+            'stages': {
+                name: {
+                    'frames': s.count,
+                    'fps': round(s.count / elapsed, 2) if elapsed else 0.0,
+                    'avg_ms': round(s.busy / s.count * 1000, 2) if s.count else 0.0
+                }
+                for name, s in self._stats.items()
+            }
+        }
@@ -0,0 +1,104 @@
+import json
+import math
+import time
+from collections import deque
+import numpy as np
+
+class RunningStats:
+    """Count, mean, min and max of a stream in O(1) memory"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value):
+        self.count += 1
+        self.mean += (value - self.mean) / self.count
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def add_many(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        if not len(values):
+            return
+        total = self.count + len(values)
+        self.mean += (values.sum() - len(values) * self.mean) / total
+        self.count = total
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+class Histogram:
+    """Fixed-bin histogram with approximate quantiles; memory is the bin count, not the sample count
+
+    Values outside [low, high) land in the first/last bin. With log=True the bins are spaced
+    geometrically, which keeps the relative error constant for latencies spanning decades.
+    """
+
+    def __init__(self, low, high, bins=100, log=False):
+        self.log = log
+        self.edges = np.geomspace(low, high, bins + 1) if log else np.linspace(low, high, bins + 1)
+        self.counts = np.zeros(bins, dtype=np.int64)
+
+    def add(self, value):
+        self.add_many([value])
+
+    def add_many(self, values):
+        index = np.searchsorted(self.edges, values, side='right') - 1
+        np.add.at(self.counts, np.clip(index, 0, len(self.counts) - 1), 1)
+
+    def quantile(self, q):
+        """Upper edge of the bin holding the q-th quantile (0 if empty)"""
+        total = self.counts.sum()
+        if not total:
+            return 0.0
+        index = int(np.searchsorted(np.cumsum(self.counts), q * total, side='left'))
+        return float(self.edges[min(index, len(self.counts) - 1) + 1])
+
+class WindowedRate:
+    """Events per second over the last `window` seconds, kept as one counter per second"""
+
+    def __init__(self, window=10):
+        self.window = window
+        self.buckets = deque()  # (second, count), at most window + 1 entries
+
+    def add(self, count=1, now=None):
+        second = int(now if now is not None else time.time())
+        if self.buckets and self.buckets[-1][0] == second:
+            self.buckets[-1][1] += count
+        else:
+            self.buckets.append([second, count])
+        self._expire(second)
+
+    def _expire(self, second):
+        while self.buckets and self.buckets[0][0] <= second - self.window:
+            self.buckets.popleft()
+
+    def rate(self, now=None):
+        now = now if now is not None else time.time()
+        self._expire(int(now))
+        if not self.buckets:
+            return 0.0
+        span = max(now - self.buckets[0][0], 1.0)
+        return sum(count for _, count in self.buckets) / min(span, self.window)
+
+class JsonlSpill:
+    """Append raw records to a JSON-lines file so they survive without living in memory"""
+
+    def __init__(self, path, flush_every=256):
+        self.path = path
+        self.flush_every = flush_every
+        self.buffer = []
+
+    def write(self, records):
+        self.buffer.extend(records)
+        if len(self.buffer) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        if not self.buffer:
+            return
+        with open(self.path, 'a') as f:
+            f.writelines(json.dumps(r) + '\n' for r in self.buffer)
+        self.buffer.clear()
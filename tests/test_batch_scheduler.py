@@ -0,0 +1,48 @@
+import threading
+import pytest
+from batch_scheduler import BatchScheduler
+
+class EchoModel:
+    """Stands in for YOLO: returns each frame as its own result and records batch sizes"""
+
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, frames, **kwargs):
+        self.batches.append(len(frames))
+        return list(frames)
+
+def test_concurrent_frames_are_batched_and_fanned_out_in_order():
+    model = EchoModel()
+    scheduler = BatchScheduler(model, max_batch_size=8, max_wait_ms=200)
+    results = {}
+    start = threading.Barrier(8)
+
+    def client(i):
+        start.wait()
+        results[i] = scheduler.predict(i, timeout=5)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results == {i: i for i in range(8)}
+    assert max(model.batches) > 1
+    assert scheduler.stats()['frames'] == 8
+
+def test_predict_many_keeps_order_and_respects_max_batch_size():
+    model = EchoModel()
+    scheduler = BatchScheduler(model, max_batch_size=4, max_wait_ms=50)
+    assert scheduler.predict_many(list(range(10)), timeout=5) == list(range(10))
+    assert max(model.batches) <= 4
+    assert sum(model.batches) == 10
+
+def test_model_errors_reach_every_caller_in_the_batch():
+    def failing(frames, **kwargs):
+        raise RuntimeError("boom")
+
+    scheduler = BatchScheduler(failing, max_batch_size=4, max_wait_ms=1)
+    with pytest.raises(RuntimeError, match="boom"):
+        scheduler.predict_many([1, 2, 3], timeout=5)
@@ -0,0 +1,77 @@
+import pytest
+import geo
+from detection_store import DetectionStore
+
+def det(severity='Low', confidence=0.5, lat=None, lon=None):
+    d = {'severity': severity, 'confidence': confidence, 'x': 10, 'y': 20, 'width': 30, 'height': 40}
+    if lat is not None:
+        d.update(lat=lat, lon=lon)
+    return d
+
+def point_east(lat, lon, meters):
+    """A point meters east of (lat, lon)"""
+    return lat, lon + meters / geo.haversine_m(lat, lon, lat, lon + 1)
+
+@pytest.fixture
+def store(tmp_path):
+    return DetectionStore(str(tmp_path / 'detections.db'), merge_radius_m=10)
+
+def test_counts_and_recent_survive_reopening(tmp_path):
+    path = str(tmp_path / 'detections.db')
+    DetectionStore(path).add([det('High'), det('Low'), det('Low')], source='cam1', ts=100.0)
+    store = DetectionStore(path)
+    assert store.counts() == {'total': 3, 'high': 1, 'medium': 0, 'low': 2}
+    assert [d['severity'] for d in store.recent(2)] == ['Low', 'Low']
+
+def test_query_filters_and_pages_newest_first(store):
+    for i in range(5):
+        store.add([det('High' if i % 2 else 'Low')], source=f'cam{i % 2}', ts=100.0 + i)
+
+    page = store.query(limit=2)
+    assert [d['ts'] for d in page['detections']] == [104.0, 103.0]
+    rest = store.query(limit=2, cursor=page['next_cursor'])
+    assert [d['ts'] for d in rest['detections']] == [102.0, 101.0]
+    assert [d['ts'] for d in store.query(severity='High')['detections']] == [103.0, 101.0]
+    assert [d['ts'] for d in store.query(start=101.0, end=103.0, source='cam0')['detections']] == [102.0]
+    assert store.query(limit=10)['next_cursor'] is None
+
+def test_reports_within_the_radius_merge_into_one_pothole(store):
+    lat, lon = 52.52, 13.405
+    store.add([det('Low', 0.6, lat, lon)], ts=1.0)
+    store.add([det('High', 0.4, *point_east(lat, lon, 6))], ts=2.0)
+
+    (pothole,) = store.potholes(lat - 0.01, lon - 0.01, lat + 0.01, lon + 0.01)['potholes']
+    assert pothole['reports'] == 2
+    assert pothole['severity'] == 'High' and pothole['confidence'] == 0.6
+    assert (pothole['first_seen'], pothole['last_seen']) == (1.0, 2.0)
+    assert geo.haversine_m(lat, lon, pothole['lat'], pothole['lon']) == pytest.approx(3, abs=0.1)
+
+def test_reports_outside_the_radius_start_a_new_pothole(store):
+    lat, lon = 52.52, 13.405
+    store.add([det(lat=lat, lon=lon)])
+    store.add([det(lat=lat, lon=point_east(lat, lon, 25)[1])])
+    assert len(store.potholes(lat - 0.01, lon - 0.01, lat + 0.01, lon + 0.01)['potholes']) == 2
+
+@pytest.mark.parametrize('lat', [0.0, 52.52, 70.0])
+def test_radius_larger_than_the_finest_search_cell_still_merges(tmp_path, lat):
+    store = DetectionStore(str(tmp_path / 'detections.db'), merge_radius_m=400)
+    store.add([det(lat=lat, lon=13.405)])
+    store.add([det(lat=lat, lon=point_east(lat, 13.405, 350)[1])])
+    store.add([det(lat=lat + 350 / 111195, lon=13.405)])
+    assert len(store.potholes(lat - 0.05, 13.3, lat + 0.05, 13.5)['potholes']) == 1
+
+def test_boxes_in_one_frame_are_different_potholes(store):
+    store.add([det(lat=52.52, lon=13.405), det(lat=52.52, lon=13.405)])
+    assert len(store.potholes(52.51, 13.40, 52.53, 13.41)['potholes']) == 2
+
+def test_aggregate_counts_potholes_not_reports(store):
+    lat, lon = 52.52, 13.405
+    store.add([det('Medium', lat=lat, lon=lon)])
+    store.add([det('Medium', lat=lat, lon=lon)])
+    store.add([det('High', lat=lat + 0.001, lon=lon)])
+
+    cells = store.aggregate(lat - 0.01, lon - 0.01, lat + 0.01, lon + 0.01, precision=5)['cells']
+    assert sum(c['total'] for c in cells) == 2
+    assert sum(c['medium'] for c in cells) == 1 and sum(c['high'] for c in cells) == 1
+    with pytest.raises(ValueError):
+        store.aggregate(-80, -170, 80, 170, precision=8)
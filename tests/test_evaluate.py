@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+from evaluate import average_precision, match_predictions
+from postprocess import box_iou
+
+def boxes(*rows):
+    return np.array(rows, dtype=np.float32)
+
+def test_each_prediction_takes_its_best_unmatched_ground_truth():
+    # The confident prediction claims gt 0; the second one must fall back to gt 1, not be dropped
+    iou = box_iou(boxes([0, 0, 10, 11], [0, 0, 10, 10.2]), boxes([0, 0, 10, 10], [0, 0, 10, 14]))
+    tp, matched = match_predictions(iou)
+    assert tp[:, 0].tolist() == [True, True]
+    assert matched.tolist() == [0, 1]
+
+def test_ground_truth_is_matched_at_most_once_per_threshold():
+    iou = box_iou(boxes([0, 0, 10, 10], [0, 0, 10, 10], [0, 0, 10, 10]), boxes([0, 0, 10, 10]))
+    tp, matched = match_predictions(iou)
+    assert tp.sum(axis=0).tolist() == [1] * tp.shape[1]
+    assert matched.tolist() == [0, -1, -1]
+
+def test_confidence_order_wins_over_higher_iou():
+    # Sorted by confidence: the first prediction keeps the only gt although the second overlaps it more
+    iou = np.array([[0.6], [0.9]])
+    tp, matched = match_predictions(iou, thresholds=[0.5])
+    assert tp[:, 0].tolist() == [True, False]
+    assert matched.tolist() == [0, -1]
+
+def test_thresholds_are_matched_independently():
+    iou = np.array([[0.7], [0.6]])
+    tp, _ = match_predictions(iou, thresholds=[0.5, 0.65, 0.75])
+    assert tp.tolist() == [[True, True, False], [False, False, False]]
+
+@pytest.mark.parametrize('shape', [(0, 3), (3, 0)])
+def test_no_predictions_or_no_ground_truth(shape):
+    tp, matched = match_predictions(np.zeros(shape))
+    assert tp.shape == (shape[0], 10) and not tp.any()
+    assert (matched == -1).all()
+
+def test_average_precision():
+    assert average_precision(np.array([[True]]), np.array([0.9]), 1) == pytest.approx([1.0])
+    # Half the ground truth found with perfect precision: 51 of the 101 recall points
+    assert average_precision(np.array([[True]]), np.array([0.9]), 2) == pytest.approx([51 / 101])
+    # A false positive ranked first halves the precision at every recall level
+    assert average_precision(np.array([[False], [True]]), np.array([0.9, 0.8]), 1) == pytest.approx([0.5])
+    assert average_precision(np.zeros((0, 1), dtype=bool), np.array([]), 3) == pytest.approx([0.0])
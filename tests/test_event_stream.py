@@ -0,0 +1,44 @@
+import json
+from event_stream import Broadcaster
+
+def drain(q):
+    messages = []
+    while not q.empty():
+        messages.append(q.get_nowait())
+    return messages
+
+def test_publish_reaches_every_subscriber():
+    broadcaster = Broadcaster()
+    a, b = broadcaster.subscribe(), broadcaster.subscribe()
+    broadcaster.publish('detections', {'n': 1})
+
+    for q in (a, b):
+        (message,) = drain(q)
+        assert message.startswith('event: detections\n')
+        assert json.loads(message.split('data: ', 1)[1]) == {'n': 1}
+
+def test_slow_subscriber_gets_one_resync_instead_of_a_backlog():
+    broadcaster = Broadcaster(max_queue=3)
+    slow = broadcaster.subscribe()
+    for i in range(4):
+        broadcaster.publish('detections', {'n': i})
+
+    assert drain(slow) == ["event: resync\ndata: {}\n\n"]
+    assert broadcaster.resyncs == 1
+
+def test_subscriber_cap_refuses_until_a_slot_frees():
+    broadcaster = Broadcaster(max_subscribers=2)
+    a, b = broadcaster.subscribe(), broadcaster.subscribe()
+    assert broadcaster.subscribe() is None
+
+    broadcaster.unsubscribe(a)
+    assert broadcaster.subscribe() is not None
+    assert broadcaster.subscriber_count() == 2
+
+def test_closing_the_stream_unsubscribes():
+    broadcaster = Broadcaster()
+    stream = broadcaster.stream()
+    assert next(stream) == "retry: 3000\n\n"
+    assert broadcaster.subscriber_count() == 1
+    stream.close()
+    assert broadcaster.subscriber_count() == 0
@@ -0,0 +1,61 @@
+import pytest
+import geo
+
+def test_encode_matches_the_reference_geohash():
+    assert geo.encode(57.64911, 10.40744, 11) == 'u4pruydqqvj'
+    assert geo.encode(57.64911, 10.40744, 5) == 'u4pru'
+
+def test_bounds_contain_the_point_and_match_cell_size():
+    cell = geo.encode(40.7128, -74.0060, 7)
+    min_lat, min_lon, max_lat, max_lon = geo.bounds(cell)
+    assert min_lat <= 40.7128 <= max_lat and min_lon <= -74.0060 <= max_lon
+    assert (max_lat - min_lat, max_lon - min_lon) == pytest.approx(geo.cell_size(7))
+
+def test_neighbors_are_the_cell_and_the_eight_around_it():
+    cell = geo.encode(40.7128, -74.0060, 6)
+    cells = geo.neighbors(cell)
+    assert len(cells) == 9 and cell in cells
+    lat_step, lon_step = geo.cell_size(6)
+    min_lat, min_lon, _, _ = geo.bounds(cell)
+    for other in cells:
+        o_lat, o_lon, _, _ = geo.bounds(other)
+        assert abs(o_lat - min_lat) <= lat_step * 1.01 and abs(o_lon - min_lon) <= lon_step * 1.01
+
+def test_neighbors_wrap_around_the_antimeridian():
+    cells = geo.neighbors(geo.encode(0.0, 179.99, 4))
+    assert any(geo.bounds(c)[1] < -179 for c in cells)
+
+def test_haversine():
+    assert geo.haversine_m(0, 0, 1, 0) == pytest.approx(111195, rel=1e-3)
+    assert geo.haversine_m(52.5, 13.4, 52.5, 13.4) == 0
+
+def test_cells_in_bbox_cover_the_box():
+    box = (52.50, 13.30, 52.55, 13.45)
+    cells = geo.cells_in_bbox(*box, precision=5)
+    assert len(cells) == len(set(cells)) == geo.count_cells(*box, precision=5)
+    for lat in (52.50, 52.525, 52.55):
+        for lon in (13.30, 13.40, 13.45):
+            assert geo.encode(lat, lon, 5) in cells
+
+def test_precision_for_bbox_respects_max_cells():
+    box = (52.50, 13.30, 52.55, 13.45)
+    precision = geo.precision_for_bbox(*box, max_cells=64)
+    assert geo.count_cells(*box, precision) <= 64 < geo.count_cells(*box, precision + 1)
+
+def test_parse_bbox_and_tile_bbox():
+    assert geo.parse_bbox('13.3,52.5,13.45,52.55') == (52.5, 13.3, 52.55, 13.45)
+    with pytest.raises(ValueError):
+        geo.parse_bbox('13.45,52.5,13.3,52.55')
+    min_lat, min_lon, max_lat, max_lon = geo.tile_bbox(0, 0, 0)
+    assert (min_lon, max_lon) == (-180, 180)
+    assert max_lat == pytest.approx(85.0511, abs=1e-4) and min_lat == pytest.approx(-85.0511, abs=1e-4)
+
+@pytest.mark.parametrize('radius_m, lat', [(10, 0), (10, 70), (200, 52), (1000, 52), (5000, 0)])
+def test_precision_for_radius_keeps_cells_wider_than_the_radius(radius_m, lat):
+    precision = geo.precision_for_radius(radius_m, lat, max_precision=7)
+    lat_step, lon_step = geo.cell_size(precision)
+    assert geo.haversine_m(lat, 0, lat + lat_step, 0) >= radius_m
+    assert geo.haversine_m(lat, 0, lat, lon_step) >= radius_m * 0.999
+    if precision < 7:
+        finer_lat, finer_lon = geo.cell_size(precision + 1)
+        assert min(geo.haversine_m(lat, 0, lat + finer_lat, 0), geo.haversine_m(lat, 0, lat, finer_lon)) < radius_m
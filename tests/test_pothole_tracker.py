@@ -0,0 +1,58 @@
+from pothole_tracker import IoUTracker, TrackManager
+
+def det(x, y, size=20, severity='Low', confidence=0.5):
+    return {'x': x, 'y': y, 'width': size, 'height': size, 'severity': severity, 'confidence': confidence}
+
+def test_overlapping_boxes_in_consecutive_frames_keep_their_track():
+    tracker = IoUTracker(max_age=1.0)
+    (first,), _ = tracker.update([det(100, 100)], now=0.0)
+    (second,), _ = tracker.update([det(103, 101)], now=0.1)
+    (third,), _ = tracker.update([det(400, 400)], now=0.2)
+    assert first == second
+    assert third != first
+
+def test_each_track_matches_at_most_one_detection_per_frame():
+    tracker = IoUTracker(max_age=1.0)
+    tracker.update([det(100, 100)], now=0.0)
+    ids, _ = tracker.update([det(101, 100), det(99, 100)], now=0.1)
+    assert len(set(ids)) == 2
+
+def test_prediction_bridges_a_missed_frame_of_a_moving_pothole():
+    # 8 px per 0.1 s, then one frame missed: the 16 px jump only overlaps the velocity-predicted box
+    tracker = IoUTracker(max_age=1.0)
+    ids = [tracker.update([det(100 + 8 * i, 100)], now=0.1 * i)[0][0] for i in range(4)]
+    ids += tracker.update([det(100 + 8 * 5, 100)], now=0.5)[0]
+    assert len(set(ids)) == 1
+
+def test_expired_track_reports_one_event_at_peak_severity():
+    tracker = IoUTracker(max_age=0.5, min_hits=2)
+    tracker.update([det(100, 100, severity='Low', confidence=0.9)], now=0.0)
+    tracker.update([det(101, 100, severity='High', confidence=0.6)], now=0.1)
+    tracker.update([det(102, 100, severity='Medium', confidence=0.8)], now=0.2)
+
+    assert tracker.expire(now=0.6) == []
+    (event,) = tracker.expire(now=0.8)
+    assert event['severity'] == 'High' and event['frames'] == 3
+    assert (event['first_seen'], event['last_seen']) == (0.0, 0.2)
+    assert tracker.tracks == []
+
+def test_tracks_below_min_hits_are_dropped_silently():
+    tracker = IoUTracker(max_age=0.5, min_hits=2)
+    tracker.update([det(100, 100)], now=0.0)
+    assert tracker.expire(now=1.0) == []
+    assert tracker.tracks == []
+
+def test_manager_expires_idle_sources_and_flushes_the_rest():
+    tracks = TrackManager(max_age=0.5, min_hits=1)
+    tracked, _ = tracks.update('cam1', [det(100, 100)], now=0.0)
+    tracks.update('cam2', [det(100, 100)], now=0.0)
+    assert tracked[0]['track_id'] == 1
+
+    tracks.update('cam2', [det(100, 100)], now=0.4)
+    # A frame from cam2 closes cam1's stale track; ids stay unique across sources
+    tracked, finished = tracks.update('cam2', [det(100, 100)], now=0.8)
+    assert [(e['source'], e['track_id']) for e in finished] == [('cam1', 1)]
+    assert tracked[0]['track_id'] == 2
+
+    assert [e['source'] for e in tracks.flush()] == ['cam2']
+    assert tracks.active_tracks() == 0
@@ -0,0 +1,92 @@
+import json
+import pytest
+import result_cache
+from result_cache import ENTRY_OVERHEAD, ResultCache, upload_key
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(result_cache.time, 'monotonic', clock)
+    return clock
+
+def entry_size(value):
+    return len(json.dumps(value, separators=(',', ':'))) + ENTRY_OVERHEAD
+
+class DictBackend:
+    def __init__(self, fail=False):
+        self.data = {}
+        self.fail = fail
+
+    def get(self, key):
+        if self.fail:
+            raise ConnectionError("down")
+        return self.data.get(key)
+
+    def set(self, key, value, ttl):
+        if self.fail:
+            raise ConnectionError("down")
+        self.data[key] = value
+
+def test_upload_key_depends_on_bytes_and_model_version():
+    assert upload_key(b'frame', 'v1') == upload_key(bytearray(b'frame'), 'v1')
+    assert upload_key(b'frame', 'v1') != upload_key(b'frame', 'v2')
+    assert upload_key(b'frame', 'v1') != upload_key(b'frame2', 'v1')
+
+def test_least_recently_used_entry_is_evicted_at_the_byte_bound(clock):
+    value = [{'severity': 'Low'}]
+    cache = ResultCache(max_bytes=2 * entry_size(value))
+    cache.put('a', value)
+    cache.put('b', value)
+    assert cache.get('a') == value  # a becomes most recent
+    cache.put('c', value)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == value and cache.get('c') == value
+    stats = cache.stats()
+    assert (stats['entries'], stats['bytes'], stats['evictions']) == (2, 2 * entry_size(value), 1)
+
+def test_entries_larger_than_the_bound_are_not_stored(clock):
+    cache = ResultCache(max_bytes=ENTRY_OVERHEAD + 4)
+    cache.put('a', ['too large'])
+    assert cache.get('a') is None and cache.stats()['bytes'] == 0
+
+def test_entries_expire_after_ttl(clock):
+    cache = ResultCache(ttl=10)
+    cache.put('a', [])
+    clock.now += 9.9
+    assert cache.get('a') == []
+    clock.now += 0.2
+    assert cache.get('a') is None
+    stats = cache.stats()
+    assert (stats['entries'], stats['bytes'], stats['hits'], stats['misses']) == (0, 0, 1, 1)
+
+def test_shared_backend_fills_the_local_tier(clock):
+    shared = DictBackend()
+    ResultCache(shared=shared).put('a', [1])
+    other = ResultCache(shared=shared)  # e.g. another worker
+    assert other.get('a') == [1]
+    assert other.get('a') == [1]
+    assert (other.shared_hits, other.hits) == (1, 1)
+
+def test_shared_backend_errors_are_counted_not_raised(clock):
+    cache = ResultCache(shared=DictBackend(fail=True))
+    cache.put('a', [1])
+    assert cache.get('a') == [1]  # Local tier still works
+    assert cache.get('b') is None
+    assert cache.stats()['shared_errors'] == 2
+
+def test_from_env(monkeypatch):
+    monkeypatch.setenv('STREETSCAN_RESULT_CACHE_MB', '0')
+    assert ResultCache.from_env() is None
+    monkeypatch.setenv('STREETSCAN_RESULT_CACHE_MB', '2')
+    monkeypatch.setenv('STREETSCAN_RESULT_CACHE_TTL', '30')
+    monkeypatch.delenv('STREETSCAN_RESULT_CACHE_URL', raising=False)
+    cache = ResultCache.from_env()
+    assert (cache.max_bytes, cache.ttl, cache.shared) == (2 * 1024 * 1024, 30.0, None)
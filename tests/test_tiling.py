@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+from tiling import Tiler, nms, parse_roi, tile_starts
+
+class FakeTensor:
+    def __init__(self, array):
+        self.array = array
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return self.array
+
+class FakeBoxes:
+    def __init__(self, rows):
+        self.data = FakeTensor(np.array([list(row) + [0] for row in rows], dtype=np.float32).reshape(-1, 6))
+
+    def __len__(self):
+        return len(self.data.array)
+
+class FakeResult:
+    """Just enough of an ultralytics Results object for boxes_to_arrays: rows of x1, y1, x2, y2, conf"""
+
+    def __init__(self, *rows):
+        self.boxes = FakeBoxes(rows)
+
+def test_parse_roi():
+    assert parse_roi('0,0.4,1,1') == (0.0, 0.4, 1.0, 1.0)
+    assert parse_roi('') is None
+    for bad in ('0,0.4,1', '0.5,0,0.4,1', '0,0,1,1.2'):
+        with pytest.raises(ValueError):
+            parse_roi(bad)
+
+def test_tile_starts_cover_the_length_with_the_last_tile_flush():
+    assert tile_starts(500, 640, 512) == [0]
+    assert tile_starts(1920, 640, 512) == [0, 512, 1024, 1280]
+
+def test_windows_tile_the_roi_with_overlap():
+    tiler = Tiler(roi=(0.0, 0.5, 1.0, 1.0), tile_size=640, overlap=0.2)
+    windows = tiler.windows((1080, 1920, 3))
+    assert {(y0, y1) for _, y0, _, y1 in windows} == {(540, 1080)}
+    assert [(x0, x1) for x0, _, x1, _ in windows] == [(0, 640), (512, 1152), (1024, 1664), (1280, 1920)]
+
+    frame = np.zeros((1080, 1920, 3), dtype=np.uint8)
+    crops = tiler.crops(frame)
+    assert all(crop.base is frame for crop in crops)
+    assert crops[0].shape == (540, 640, 3)
+
+def test_nms_drops_overlaps_and_clipped_halves():
+    xyxy = np.array([[0, 0, 100, 100], [5, 5, 100, 100], [0, 0, 40, 100], [300, 300, 350, 350]], dtype=np.float32)
+    conf = np.array([0.9, 0.8, 0.7, 0.6], dtype=np.float32)
+    # Box 1 by IoU, box 2 because it lies inside box 0 (intersection over smaller area)
+    assert nms(xyxy, conf).tolist() == [0, 3]
+    assert nms(xyxy[:1], conf[:1]).tolist() == [0]
+
+def test_merge_maps_tile_boxes_back_to_the_frame():
+    tiler = Tiler(tile_size=640, overlap=0.2)
+    windows = tiler.windows((640, 1152, 3))
+    assert [w[0] for w in windows] == [0, 512]
+
+    # The same pothole seen by both tiles at x 520-600 in the frame, plus one low-confidence box
+    results = [FakeResult([520, 10, 600, 90, 0.9], [0, 0, 10, 10, 0.2]),
+               FakeResult([8, 10, 88, 90, 0.8])]
+    xyxy, conf = tiler.merge(results, (640, 1152, 3), conf_threshold=0.5)
+    assert xyxy.tolist() == [[520, 10, 600, 90]]
+    assert conf.tolist() == pytest.approx([0.9])
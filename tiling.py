@@ -0,0 +1,101 @@
+import numpy as np
+from postprocess import boxes_to_arrays
+
+def parse_roi(value):
+    """'x0,y0,x1,y1' frame fractions (e.g. '0,0.4,1,1' for the lower 60%) to a tuple, '' to None"""
+    if not value:
+        return None
+    roi = tuple(float(v) for v in value.split(','))
+    if len(roi) != 4 or not (0 <= roi[0] < roi[2] <= 1 and 0 <= roi[1] < roi[3] <= 1):
+        raise ValueError(f"Invalid ROI '{value}', expected x0,y0,x1,y1 fractions with x0 < x1 and y0 < y1")
+    return roi
+
+def tile_starts(length, tile, stride):
+    """Tile offsets covering [0, length), the last one flush with the end"""
+    if length <= tile:
+        return [0]
+    starts = list(range(0, length - tile, stride))
+    return starts + [length - tile]
+
+def nms(xyxy, conf, iou_threshold=0.5, ios_threshold=0.7):
+    """Greedy NMS across tiles
+
+    Besides IoU, a box mostly contained in a higher-scoring one (intersection over the smaller
+    area above ios_threshold) is suppressed, which removes the clipped half of a pothole that
+    straddles a tile border.
+    """
+    if len(conf) < 2:
+        return np.arange(len(conf))
+
+    lt = np.maximum(xyxy[:, None, :2], xyxy[None, :, :2])
+    rb = np.minimum(xyxy[:, None, 2:], xyxy[None, :, 2:])
+    inter = np.prod(np.clip(rb - lt, 0, None), axis=2)
+    area = np.prod(xyxy[:, 2:] - xyxy[:, :2], axis=1)
+    iou = inter / (area[:, None] + area[None, :] - inter + 1e-9)
+    ios = inter / (np.minimum(area[:, None], area[None, :]) + 1e-9)
+    overlaps = (iou > iou_threshold) | (ios > ios_threshold)
+
+    keep = []
+    suppressed = np.zeros(len(conf), dtype=bool)
+    for i in np.argsort(-conf, kind='stable'):
+        if suppressed[i]:
+            continue
+        keep.append(i)
+        suppressed |= overlaps[i]
+    return np.array(keep, dtype=np.int64)
+
+class Tiler:
+    """Crop frames to a road ROI, optionally split into overlapping tiles, and merge results back
+
+    Tiles of one frame are sent through the model as a batch; their boxes are shifted back to
+    full-frame coordinates so severity is still judged against the whole frame.
+    """
+
+    def __init__(self, roi=None, tile_size=0, overlap=0.2, iou_threshold=0.5, ios_threshold=0.7):
+        self.roi = roi
+        self.tile_size = tile_size
+        self.overlap = overlap
+        self.iou_threshold = iou_threshold
+        self.ios_threshold = ios_threshold
+        self._windows = {}  # Cache per frame size: cameras rarely change resolution
+
+    def windows(self, frame_shape):
+        """(x0, y0, x1, y1) pixel windows to run the model on for a frame of this shape"""
+        height, width = frame_shape[:2]
+        if (height, width) in self._windows:
+            return self._windows[(height, width)]
+
+        x0, y0, x1, y1 = self.roi or (0.0, 0.0, 1.0, 1.0)
+        left, top = int(x0 * width), int(y0 * height)
+        right, bottom = int(round(x1 * width)), int(round(y1 * height))
+
+        if not self.tile_size:
+            windows = [(left, top, right, bottom)]
+        else:
+            stride = max(1, int(self.tile_size * (1 - self.overlap)))
+            tile_w, tile_h = min(self.tile_size, right - left), min(self.tile_size, bottom - top)
+            windows = [(left + tx, top + ty, left + tx + tile_w, top + ty + tile_h)
+                       for ty in tile_starts(bottom - top, tile_h, stride)
+                       for tx in tile_starts(right - left, tile_w, stride)]
+
+        self._windows[(height, width)] = windows
+        return windows
+
+    def crops(self, frame):
+        """Views into the frame, one per window (no copies)"""
+        return [frame[y0:y1, x0:x1] for x0, y0, x1, y1 in self.windows(frame.shape)]
+
+    def merge(self, results, frame_shape, conf_threshold=0.5):
+        """Thresholded full-frame (xyxy, conf) from the per-window results of one frame"""
+        boxes, scores = [], []
+        for (x0, y0, _, _), result in zip(self.windows(frame_shape), results):
+            xyxy, conf = boxes_to_arrays(result)
+            keep = conf > conf_threshold
+            boxes.append(xyxy[keep] + np.array([x0, y0, x0, y0], dtype=xyxy.dtype))
+            scores.append(conf[keep])
+
+        xyxy, conf = np.concatenate(boxes), np.concatenate(scores)
+        if len(results) > 1:
+            keep = nms(xyxy, conf, self.iou_threshold, self.ios_threshold)
+            xyxy, conf = xyxy[keep], conf[keep]
+        return xyxy, conf
@@ -0,0 +1,331 @@
+import argparse
+import functools
+import hashlib
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import cv2
+import numpy as np
+from evaluate import IMAGE_SUFFIXES, label_path_for
+
+INDEX_FILE = 'index.json'
+
+def file_hash(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+def read_labels(image_path):
+    """Raw YOLO rows (cls cx cy w h, normalized) for an image, (0, 5) if unlabeled"""
+    label_path = label_path_for(image_path)
+    if not label_path.exists() or os.path.getsize(label_path) == 0:
+        return np.zeros((0, 5), dtype=np.float32)
+    return np.loadtxt(label_path, ndmin=2, dtype=np.float32)[:, :5]
+
+def resize_long_side(im, imgsz):
+    """Same resize as ultralytics' rect-mode load_image, so cached pixels match what it would compute"""
+    h0, w0 = im.shape[:2]
+    r = imgsz / max(h0, w0)
+    if r != 1:
+        w, h = min(math.ceil(w0 * r), imgsz), min(math.ceil(h0 * r), imgsz)
+        im = cv2.resize(im, (w, h), interpolation=cv2.INTER_LINEAR)
+    return im
+
+def _decode_chunk(args):
+    """Decode and resize images straight into their slots of the memory-mapped store"""
+    cache_dir, items, imgsz = args
+    images = np.load(os.path.join(cache_dir, 'images.npy'), mmap_mode='r+')
+    shapes = []
+    for path, slot in items:
+        im = cv2.imread(path, cv2.IMREAD_COLOR)
+        if im is None:
+            shapes.append((slot, None))
+            continue
+        h0, w0 = im.shape[:2]
+        im = resize_long_side(im, imgsz)
+        h, w = im.shape[:2]
+        images[slot, :h, :w] = im
+        shapes.append((slot, (h0, w0, h, w)))
+    images.flush()
+    return shapes
+
+class TrainingCache:
+    """Pre-decoded, pre-resized training images in one fixed-stride memory-mapped array
+
+    images.npy holds one imgsz x imgsz x 3 slot per unique image (content-hashed, top-left
+    aligned), shapes.npy the original and resized size of each slot, labels.npy every label
+    row packed back to back. index.json maps each image path to its hash, slot and label
+    range, so a rebuild only decodes images whose content is new.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        with open(os.path.join(cache_dir, INDEX_FILE)) as f:
+            self.index = json.load(f)
+        self.imgsz = self.index['imgsz']
+        # Copy-on-write: reads are zero-copy page-cache hits, in-place augmentations stay private
+        self.images = np.load(os.path.join(cache_dir, 'images.npy'), mmap_mode='c')
+        self.shapes = np.load(os.path.join(cache_dir, 'shapes.npy'))
+        self.labels = np.load(os.path.join(cache_dir, 'labels.npy'))
+        self.files = self.index['files']
+
+    def entry(self, image_path):
+        return self.files.get(os.path.abspath(image_path))
+
+    def image(self, entry):
+        """(view of the resized image, original hw, resized hw)"""
+        h0, w0, h, w = self.shapes[entry['slot']]
+        return self.images[entry['slot'], :h, :w], (int(h0), int(w0)), (int(h), int(w))
+
+    def image_labels(self, entry):
+        start, count = entry['labels']
+        return self.labels[start:start + count]
+
+def build_cache(image_dirs, cache_dir='pothole_data/cache', imgsz=640, workers=None, chunk_size=64):
+    """Create or update the cache for every image under image_dirs; only new content is decoded"""
+    os.makedirs(cache_dir, exist_ok=True)
+    index_path = os.path.join(cache_dir, INDEX_FILE)
+    images_path = os.path.join(cache_dir, 'images.npy')
+    shapes_path = os.path.join(cache_dir, 'shapes.npy')
+
+    old = {'imgsz': imgsz, 'capacity': 0, 'files': {}, 'free': []}
+    if os.path.exists(index_path):
+        with open(index_path) as f:
+            old = json.load(f)
+        if old['imgsz'] != imgsz:
+            print(f"♻️ imgsz changed ({old['imgsz']} -> {imgsz}), rebuilding the cache")
+            old = {'imgsz': imgsz, 'capacity': 0, 'files': {}, 'free': []}
+
+    paths = sorted({os.path.abspath(p) for d in image_dirs for p in Path(d).rglob('*')
+                    if p.suffix.lower() in IMAGE_SUFFIXES})
+
+    # Content hashes; unchanged size+mtime reuses the recorded hash instead of re-reading the file
+    started = time.perf_counter()
+    hashes = {}
+    for path in paths:
+        stat = os.stat(path)
+        previous = old['files'].get(path)
+        if previous and previous['size'] == stat.st_size and previous['mtime_ns'] == stat.st_mtime_ns:
+            hashes[path] = previous['hash']
+        else:
+            hashes[path] = file_hash(path)
+
+    # Slots: known content keeps its slot. New content only goes into slots that the current
+    # index doesn't reference, so an interrupted build never corrupts images the index points at.
+    slot_of = {entry['hash']: entry['slot'] for entry in old['files'].values()}
+    in_use = {slot_of[h] for h in set(hashes.values()) if h in slot_of}
+    free = sorted(set(old['free']))
+    next_slot = old['capacity']
+    todo = {}
+    for path in paths:
+        h = hashes[path]
+        if h in slot_of or h in todo:
+            continue
+        if free:
+            slot = free.pop(0)
+        else:
+            slot, next_slot = next_slot, next_slot + 1
+        todo[h] = (path, slot)
+
+    capacity = max(old['capacity'], next_slot)
+    if capacity > old['capacity']:
+        capacity = max(capacity, int(old['capacity'] * 1.25))  # Headroom so small deltas don't regrow the file
+        grow_store(images_path, shapes_path, old['capacity'], capacity, imgsz)
+
+    if todo:
+        items = sorted(todo.values(), key=lambda item: item[1])
+        chunks = [(cache_dir, items[i:i + chunk_size], imgsz) for i in range(0, len(items), chunk_size)]
+        workers = min(workers or os.cpu_count() or 1, len(chunks))
+        print(f"🗜️ Decoding {len(items)} new images into the cache with {workers} processes...")
+        shapes = np.load(shapes_path, mmap_mode='r+')
+        with ProcessPoolExecutor(workers) as pool:
+            for part in pool.map(_decode_chunk, chunks):
+                for slot, shape in part:
+                    shapes[slot] = shape if shape is not None else (0, 0, 0, 0)
+        shapes.flush()
+        del shapes
+        for h, (path, slot) in todo.items():
+            slot_of[h] = slot
+
+    # Labels are small: repack all of them on every build so label edits are always picked up
+    shapes = np.load(shapes_path)
+    files, label_rows, offset = {}, [], 0
+    for path in paths:
+        slot = slot_of[hashes[path]]
+        if not shapes[slot][0]:
+            continue  # Unreadable image
+        rows = read_labels(path)
+        label_rows.append(rows)
+        stat = os.stat(path)
+        files[path] = {'hash': hashes[path], 'slot': slot, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns,
+                       'labels': [offset, len(rows)]}
+        offset += len(rows)
+    np.save(os.path.join(cache_dir, 'labels.npy'),
+            np.concatenate(label_rows) if label_rows else np.zeros((0, 5), dtype=np.float32))
+
+    used = {entry['slot'] for entry in files.values()}
+    index = {'imgsz': imgsz, 'capacity': capacity, 'files': files,
+             'free': sorted(set(range(capacity)) - used)}
+    tmp = index_path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(index, f)
+    os.replace(tmp, index_path)
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ Cache ready: {len(files)} images ({len(todo)} new, {len(in_use)} reused) in {elapsed:.1f}s "
+          f"-> {cache_dir}")
+    return index
+
+def grow_store(images_path, shapes_path, old_capacity, capacity, imgsz):
+    """Enlarge the fixed-stride arrays, copying existing slots without decoding anything"""
+    from numpy.lib.format import open_memmap
+    tmp_images, tmp_shapes = images_path + '.tmp.npy', shapes_path + '.tmp.npy'
+    images = open_memmap(tmp_images, mode='w+', dtype=np.uint8, shape=(capacity, imgsz, imgsz, 3))
+    shapes = np.zeros((capacity, 4), dtype=np.int32)
+    if old_capacity:
+        old_images = np.load(images_path, mmap_mode='r')
+        for start in range(0, old_capacity, 256):
+            end = min(start + 256, old_capacity)
+            images[start:end] = old_images[start:end]
+        shapes[:old_capacity] = np.load(shapes_path)
+        del old_images
+    images.flush()
+    del images
+    np.save(tmp_shapes, shapes)
+    os.replace(tmp_images, images_path)
+    os.replace(tmp_shapes, shapes_path)
+
+def dataset_image_dirs(data_yaml):
+    """Train and val image folders of a YOLO dataset yaml"""
+    import yaml
+    with open(data_yaml) as f:
+        data = yaml.safe_load(f)
+    root = Path(data.get('path', '.'))
+    if not root.is_absolute():
+        root = Path(data_yaml).parent / root
+    dirs = []
+    for split in ('train', 'val'):
+        for entry in data[split] if isinstance(data.get(split), list) else [data.get(split)]:
+            if entry:
+                dirs.append(str(root / entry))
+    return dirs
+
+@functools.lru_cache(maxsize=None)
+def cached_dataset_class():
+    """YOLODataset subclass reading from a TrainingCache (built lazily: importing ultralytics is slow)"""
+    from ultralytics.data.dataset import YOLODataset
+
+    class CachedYOLODataset(YOLODataset):
+        """YOLODataset that skips JPEG decoding, resizing and label scanning for cached images"""
+
+        def __init__(self, *args, store, **kwargs):
+            self.store = store  # Needed by get_labels, which the base constructor calls
+            super().__init__(*args, **kwargs)
+
+        def get_labels(self):
+            entries = [self.store.entry(f) for f in self.im_files]
+            if any(e is None for e in entries) or self.store.imgsz != self.imgsz:
+                print("⚠️ Training cache is stale for this dataset, falling back to reading images; "
+                      "run `python train_cache.py` to update it")
+                self.store = None
+                return super().get_labels()
+
+            labels = []
+            for im_file, entry in zip(self.im_files, entries):
+                rows = self.store.image_labels(entry)
+                h0, w0 = self.store.shapes[entry['slot']][:2]
+                labels.append({
+                    'im_file': im_file,
+                    'shape': (int(h0), int(w0)),
+                    'cls': rows[:, :1].copy(),
+                    'bboxes': rows[:, 1:5].copy(),
+                    'segments': [],
+                    'keypoints': None,
+                    'normalized': True,
+                    'bbox_format': 'xywh'
+                })
+            return labels
+
+        def load_image(self, i, rect_mode=True, resize_short=False):
+            entry = self.store.entry(self.im_files[i]) if self.store is not None else None
+            if entry is None or not rect_mode or resize_short:
+                return super().load_image(i, rect_mode, resize_short)
+            im, hw0, hw = self.store.image(entry)
+
+            # Same buffer bookkeeping as the base class: Mosaic/MixUp draw their extra images from it
+            if self.augment:
+                self.ims[i], self.im_hw0[i], self.im_hw[i] = im, hw0, hw
+                self.buffer.append(i)
+                if 1 < len(self.buffer) >= self.max_buffer_length:
+                    j = self.buffer.pop(0)
+                    self.ims[j], self.im_hw0[j], self.im_hw[j] = None, None, None
+            return im, hw0, hw
+
+    return CachedYOLODataset
+
+def check_cache(cache_dir, data_yaml='pothole_dataset.yaml', samples=16):
+    """Index an augmented (mosaic) training dataset built on the cache, as the trainer would
+
+    Fails fast with the real exception instead of on the first batch of a long run.
+    """
+    import yaml
+    from ultralytics.cfg import get_cfg
+    store = TrainingCache(cache_dir)
+    with open(data_yaml) as f:
+        names = yaml.safe_load(f).get('names', ['pothole'])
+    data = {'names': dict(enumerate(names)) if isinstance(names, list) else names, 'nc': len(names), 'channels': 3}
+    dataset = cached_dataset_class()(img_path=dataset_image_dirs(data_yaml)[0], imgsz=store.imgsz, augment=True,
+                                     hyp=get_cfg(overrides={'imgsz': store.imgsz}), data=data, store=store)
+    for i in range(min(samples, len(dataset))):
+        sample = dataset[i]
+    print(f"✅ Cache check passed: {min(samples, len(dataset))} augmented samples, "
+          f"image batch shape {tuple(sample['img'].shape)}")
+
+def cached_trainer(cache_dir):
+    """An ultralytics DetectionTrainer whose datasets read images and labels from the cache"""
+    from ultralytics.models.yolo.detect import DetectionTrainer
+    from ultralytics.utils import colorstr
+    from ultralytics.utils.torch_utils import unwrap_model
+    CachedYOLODataset = cached_dataset_class()
+
+    class CachedDetectionTrainer(DetectionTrainer):
+        def build_dataset(self, img_path, mode='train', batch=None):
+            gs = max(int(unwrap_model(self.model).stride.max()), 32)
+            rect = self.args.rect or mode == 'val'
+            return CachedYOLODataset(
+                img_path=img_path,
+                imgsz=self.args.imgsz,
+                batch_size=batch,
+                augment=mode == 'train',
+                hyp=self.args,
+                rect=rect,
+                cache=None,  # The memory-mapped store replaces ultralytics' RAM/disk caches
+                single_cls=self.args.single_cls or False,
+                stride=gs,
+                pad=0.0 if mode == 'train' else 0.5,
+                prefix=colorstr(f"{mode}: "),
+                task=self.args.task,
+                classes=self.args.classes,
+                data=self.data,
+                fraction=self.args.fraction if mode == 'train' else 1.0,
+                store=TrainingCache(cache_dir))
+
+    return CachedDetectionTrainer
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-decode training images into a memory-mapped cache")
+    parser.add_argument('--data', default='pothole_dataset.yaml')
+    parser.add_argument('--cache-dir', default='pothole_data/cache')
+    parser.add_argument('--imgsz', type=int, default=640)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--check', action='store_true', help="index a few augmented samples from the cache")
+    args = parser.parse_args()
+
+    build_cache(dataset_image_dirs(args.data), args.cache_dir, args.imgsz, args.workers)
+    if args.check:
+        check_cache(args.cache_dir, args.data)
+
+if __name__ == "__main__":
+    main()
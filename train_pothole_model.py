@@ -1,6 +1,9 @@
 from ultralytics import YOLO
+import os
 import cv2
 import numpy as np
+from postprocess import classify_severity, filter_boxes
+from stream_pipeline import StreamPipeline
 
 def train_pothole_model():
     """Train YOLO model for pothole detection"""
@@ -8,13 +11,23 @@ def train_pothole_model():
     # Load pre-trained YOLOv8 model
     model = YOLO('yolov8n.pt')
     
+    # Decode and resize every image once into a memory-mapped store (only new images on later runs)
+    trainer = None
+    if os.getenv('STREETSCAN_TRAIN_CACHE', '1') != '0':
+        from train_cache import build_cache, cached_trainer, check_cache, dataset_image_dirs
+        cache_dir = os.getenv('STREETSCAN_TRAIN_CACHE_DIR', 'pothole_data/cache')
+        build_cache(dataset_image_dirs('pothole_dataset.yaml'), cache_dir, imgsz=640)
+        check_cache(cache_dir, 'pothole_dataset.yaml')
+        trainer = cached_trainer(cache_dir)
+    
     # Train the model
     results = model.train(
         data='pothole_dataset.yaml',
         epochs=100,
         imgsz=640,
         batch=16,
-        device='0' if cv2.cuda.getCudaEnabledDeviceCount() > 0 else 'cpu'
+        device='0' if cv2.cuda.getCudaEnabledDeviceCount() > 0 else 'cpu',
+        trainer=trainer
     )
     
     # Save trained model
@@ -23,57 +36,47 @@ def train_pothole_model():
 
 def calculate_severity(bbox, frame_shape):
     """Calculate pothole severity based on size"""
-    x1, y1, x2, y2 = bbox
-    pothole_area = (x2 - x1) * (y2 - y1)
-    frame_area = frame_shape[0] * frame_shape[1]
-    
-    severity_ratio = pothole_area / frame_area
-    
-    if severity_ratio < 0.01:
-        return "Low"
-    elif severity_ratio < 0.05:
-        return "Medium"
-    else:
-        return "High"
+    return str(classify_severity(np.asarray([bbox], dtype=np.float32), frame_shape)[0])
 
 def detect_potholes(model_path, video_source=0):
-    """Real-time pothole detection"""
+    """Real-time pothole detection on a camera index, RTSP URL or video file
+    
+    Capture, inference and display run as separate pipeline stages; live sources
+    drop stale frames while files are processed frame by frame.
+    """
     model = YOLO(model_path)
-    cap = cv2.VideoCapture(video_source)
     
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
-            
-        results = model(frame)
-        
-        for r in results:
-            boxes = r.boxes
-            if boxes is not None:
-                for box in boxes:
-                    x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
-                    conf = box.conf[0].cpu().numpy()
-                    
-                    if conf > 0.5:  # Confidence threshold
-                        severity = calculate_severity([x1, y1, x2, y2], frame.shape)
-                        
-                        # Draw bounding box
-                        color = (0, 255, 0) if severity == "Low" else (0, 165, 255) if severity == "Medium" else (0, 0, 255)
-                        cv2.rectangle(frame, (int(x1), int(y1)), (int(x2), int(y2)), color, 2)
-                        cv2.putText(frame, f'Pothole: {severity}', (int(x1), int(y1-10)), 
-                                  cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
+    def infer(frame):
+        results = model(frame, verbose=False)
+        return filter_boxes(results[0], frame.shape, conf_threshold=0.5)
+    
+    def render(frame, boxes):
+        xyxy, _, severities = boxes
+        for (x1, y1, x2, y2), severity in zip(xyxy.astype(int).tolist(), severities.tolist()):
+            # Draw bounding box
+            color = (0, 255, 0) if severity == "Low" else (0, 165, 255) if severity == "Medium" else (0, 0, 255)
+            cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
+            cv2.putText(frame, f'Pothole: {severity}', (x1, y1 - 10), 
+                      cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
         
         cv2.imshow('Pothole Detection', frame)
-        if cv2.waitKey(1) & 0xFF == ord('q'):
-            break
+        return not (cv2.waitKey(1) & 0xFF == ord('q'))
     
-    cap.release()
+    stats = StreamPipeline(video_source, infer, render).run()
     cv2.destroyAllWindows()
+    
+    print(f"📊 Pipeline ({stats['mode']}): {stats['dropped_frames']} dropped frames")
+    for stage, s in stats['stages'].items():
+        print(f"  {stage}: {s['fps']} FPS, {s['avg_ms']} ms/frame")
+    return stats
 
 if __name__ == "__main__":
     # Train model
     model = train_pothole_model()
     
+    # Export CPU-optimized variants (ONNX, INT8, OpenVINO) and compare them
+    from export_model import export_cpu_variants, benchmark_variants
+    benchmark_variants(export_cpu_variants('pothole_detector.pt'))
+    
     # Run detection
     detect_potholes('pothole_detector.pt')
\ No newline at end of file
@@ -0,0 +1,54 @@
+import math
+import os
+
+class UploadHints:
+    """Server-chosen upload settings returned with every /detect response
+
+    Clients are told never to send more pixels than the model will look at (its input size,
+    widened for a road ROI, unlimited when tiling needs full resolution), and to slow down and
+    compress harder as the server falls behind. Load is the worse of the batch queue depth
+    relative to one batch and the smoothed request latency relative to the target.
+    """
+
+    def __init__(self, interval_ms=500, max_interval_ms=5000, target_latency_ms=250, jpeg_quality=0.8,
+                 min_jpeg_quality=0.5, smoothing=0.2):
+        self.interval_ms = interval_ms
+        self.max_interval_ms = max_interval_ms
+        self.target_latency = target_latency_ms / 1000
+        self.jpeg_quality = jpeg_quality
+        self.min_jpeg_quality = min_jpeg_quality
+        self.smoothing = smoothing
+        self.latency = 0.0  # Exponential moving average; a lost update between threads is harmless
+
+    @classmethod
+    def from_env(cls):
+        env = os.environ
+        return cls(interval_ms=float(env.get('STREETSCAN_HINT_INTERVAL_MS', 500)),
+                   max_interval_ms=float(env.get('STREETSCAN_HINT_MAX_INTERVAL_MS', 5000)),
+                   target_latency_ms=float(env.get('STREETSCAN_TARGET_LATENCY_MS', 250)))
+
+    def observe(self, seconds):
+        """Feed the handling time of one /detect request"""
+        self.latency += self.smoothing * (seconds - self.latency)
+
+    def max_dimension(self, config):
+        """Longest upload side that still gives the model its full input resolution"""
+        if config.tile_size:
+            return None  # Tiles are cut from the full-resolution frame
+        x0, y0, x1, y1 = config.roi or (0.0, 0.0, 1.0, 1.0)
+        return int(math.ceil(config.imgsz / min(x1 - x0, y1 - y0)))
+
+    def advise(self, engine):
+        load = max(engine.scheduler.queue_depth() / engine.config.max_batch_size,
+                   self.latency / self.target_latency)
+        overload = max(0.0, load - 1.0)
+        return {
+            'max_dimension': self.max_dimension(engine.config),
+            'jpeg_quality': round(max(self.min_jpeg_quality, self.jpeg_quality - 0.15 * overload), 2),
+            'interval_ms': int(min(self.max_interval_ms, self.interval_ms * max(1.0, load))),
+            'load': round(load, 2)
+        }
+
+    def loading(self):
+        """Hint sent with 503s while the model loads: come back later, not in 500 ms"""
+        return {'interval_ms': int(min(self.max_interval_ms, self.interval_ms * 4))}